@@ -0,0 +1,205 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import wang_poddar as sudoku
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS = os.path.join(HERE, "benchmark_corpus_v2.txt")
+BASELINE = os.path.join(HERE, "benchmark_baseline.json")
+TIERS = ("easy", "medium", "hard", "extreme", "ludicrous", "examples")
+
+def load_corpus(path):
+    corpus = {tier: [] for tier in TIERS}
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                tier, puzzle = line.split()
+                corpus[tier].append(puzzle)
+    return corpus
+
+def write_corpus(path, corpus, header):
+    with open(path, "w") as file:
+        file.write(f"# {header}\n")
+        for tier, puzzles in corpus.items():
+            for puzzle in puzzles:
+                file.write(f"{tier} {puzzle}\n")
+
+# tier of a puzzle the techniques solve, by the hardest technique it needs
+def technique_tier(hardest):
+    if hardest <= sudoku.NAKED_SINGLE:
+        return "easy"
+    if hardest <= sudoku.BOX_LINE:
+        return "medium"
+    if hardest <= sudoku.HIDDEN_TRIPLE:
+        return "hard"
+    return "extreme"
+
+# Removes givens in random order as long as the puzzle stays unique, whatever the
+# techniques make of it.
+def dig_minimal(rng):
+    puzzle = sudoku.random_grid(rng)
+    for i in rng.sample(range(81), 81):
+        digit = puzzle[i]
+        puzzle[i] = 0
+        cands = sudoku.value_candidates(puzzle)
+        cands[i] &= ~sudoku.DIGIT_BIT[digit]
+        if sudoku.search(puzzle, cands)[0]:
+            puzzle[i] = digit
+    return "".join(map(str, puzzle))
+
+# count distinct unique puzzles per tier: generate_many() puzzles sorted into tiers by
+# their hardest technique, and minimal puzzles the techniques cannot finish as ludicrous.
+# The bundled example boards follow as they are, two of them invalid.
+def generate_corpus(count, seed, workers=None):
+    corpus = {tier: [] for tier in TIERS}
+    for found in sudoku.generate_many(seed=seed, workers=workers):
+        puzzles = corpus[technique_tier(found.hardest)]
+        if len(puzzles) < count and found.puzzle not in puzzles:
+            puzzles.append(found.puzzle)
+        if all(len(corpus[tier]) >= count for tier in TIERS[:-2]):
+            break
+
+    rng = random.Random(seed)
+    puzzles = corpus["ludicrous"]
+    while len(puzzles) < count:
+        puzzle = dig_minimal(rng)
+        if puzzle not in puzzles and not sudoku.grade(sudoku.puzzle_values(puzzle))[0]:
+            puzzles.append(puzzle)
+    corpus["examples"] = [puzzle for label, puzzle in sudoku.EXAMPLE_PUZZLES]
+    return corpus
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+# contradictions are invalid puzzles, kept apart from puzzles the techniques stall on
+def run_tier(puzzles, repeat):
+    best = [float("inf")] * len(puzzles)
+    solved = contradictions = 0
+    for _ in range(repeat):
+        solved = contradictions = 0
+        for k, puzzle in enumerate(puzzles):
+            start = time.perf_counter()
+            board = sudoku.SudokuBoard.from_string(puzzle).solve()
+            best[k] = min(best[k], time.perf_counter() - start)
+            solved += board.is_solved()
+            contradictions += board.contradiction is not None
+    return best, solved, contradictions
+
+def peak_memory(corpus):
+    tracemalloc.start()
+    for puzzles in corpus.values():
+        for puzzle in puzzles:
+            sudoku.SudokuBoard.from_string(puzzle).solve()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def benchmark(corpus, repeat):
+    results = {"tiers": {}}
+    total_time = total_count = 0
+    for tier, puzzles in corpus.items():
+        latencies, solved, contradictions = run_tier(puzzles, repeat)
+        total_time += sum(latencies)
+        total_count += len(puzzles)
+        results["tiers"][tier] = {
+            "count": len(puzzles),
+            "solved": solved,
+            "stalled": len(puzzles) - solved - contradictions,
+            "contradictions": contradictions,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+        }
+    results["throughput"] = total_count / total_time
+    results["peak_kib"] = peak_memory(corpus) / 1024
+    return results
+
+# Solved counts are deterministic, so any drop there is a regression. Latencies of a few
+# milliseconds jitter by more than threshold from run to run, so they also have to move
+# by slack_ms.
+def regressions(results, baseline, threshold, slack_ms=1.0):
+    found = []
+
+    def check(name, current, previous, higher_is_worse, exact=False, slack=0):
+        limit = 0 if exact else threshold
+        if higher_is_worse and current > previous * (1 + limit) + slack:
+            found.append(f"{name}: {previous:.3f} -> {current:.3f}")
+        elif not higher_is_worse and current < previous * (1 - limit):
+            found.append(f"{name}: {previous:.3f} -> {current:.3f}")
+
+    check("throughput", results["throughput"], baseline["throughput"], False)
+    check("peak_kib", results["peak_kib"], baseline["peak_kib"], True)
+    for tier, stats in results["tiers"].items():
+        previous = baseline["tiers"].get(tier)
+        if previous is None:
+            continue
+        check(f"{tier} p50_ms", stats["p50_ms"], previous["p50_ms"], True, slack=slack_ms)
+        check(f"{tier} p99_ms", stats["p99_ms"], previous["p99_ms"], True, slack=slack_ms)
+        check(f"{tier} solved", stats["solved"], previous["solved"], False, exact=True)
+    return found
+
+def print_report(results):
+    print(f"{'tier':<10} {'count':>6} {'solved':>7} {'stalled':>8} {'invalid':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for tier, stats in results["tiers"].items():
+        print(
+            f"{tier:<10} {stats['count']:>6} {stats['solved']:>7} {stats['stalled']:>8} "
+            f"{stats['contradictions']:>8} {stats['p50_ms']:>8.3f} {stats['p99_ms']:>8.3f}"
+        )
+    print(f"throughput: {results['throughput']:.1f} puzzles/sec")
+    print(f"peak memory: {results['peak_kib']:.1f} KiB")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SudokuBoard.solve() over the graded corpus.")
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--write-corpus", type=int, metavar="COUNT",
+                        help="generate COUNT distinct puzzles per tier, plus the example boards, into --corpus and exit")
+    parser.add_argument("--seed", type=int, default=1, help="generator seed for --write-corpus")
+    parser.add_argument("-j", "--workers", type=int, help="generator processes for --write-corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per tier; the fastest time per puzzle is kept")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed relative regression")
+    parser.add_argument("--slack-ms", type=float, default=1.0, help="latency change always allowed")
+    args = parser.parse_args(argv)
+
+    if args.write_corpus:
+        corpus = generate_corpus(args.write_corpus, args.seed, args.workers)
+        header = f"generated by benchmark.py --write-corpus {args.write_corpus} --seed {args.seed}"
+        write_corpus(args.corpus, corpus, header)
+        print(f"wrote {sum(map(len, corpus.values()))} puzzles to {args.corpus}")
+        return 0
+
+    corpus = load_corpus(args.corpus)
+    results = benchmark(corpus, args.repeat)
+    results["corpus"] = {"file": os.path.basename(args.corpus), "count": sum(map(len, corpus.values()))}
+    print_report(results)
+
+    if args.save:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline to compare against; run with --save first")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if baseline["corpus"] != results["corpus"]:
+        print(f"baseline was recorded on a different corpus: {baseline['corpus']}")
+        return 2
+
+    found = regressions(results, baseline, args.threshold, args.slack_ms)
+    for line in found:
+        print(f"regression: {line}")
+    return 1 if found else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
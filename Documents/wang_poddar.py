@@ -0,0 +1,2483 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager
+from itertools import combinations, islice, permutations, product, takewhile
+from itertools import count as count_from
+from math import isqrt
+
+def popcount(mask):
+    return bin(mask).count("1")
+
+# mask -> function(mask) for masks too wide to tabulate up front: entries are computed on
+# first use, and the table starts over once it holds limit of them
+class MaskTable(dict):
+    __slots__ = ("function", "limit")
+
+    def __init__(self, function, limit=1 << 16):
+        super().__init__()
+        self.function = function
+        self.limit = limit
+
+    def __missing__(self, mask):
+        if len(self) >= self.limit:
+            self.clear()
+        value = self[mask] = self.function(mask)
+        return value
+
+# Index tables for boards with box x box boxes, size = box * box digits and size * size
+# cells. Built once per box size by geometry() and shared by every board of that size.
+class Geometry:
+    def __init__(self, box):
+        size = box * box
+        cells = size * size
+        self.box, self.size, self.cells = box, size, cells
+        self.all_digits = (1 << size) - 1
+        self.digit_bit = [0] + [1 << (d - 1) for d in range(1, size + 1)]
+
+        def mask_digits(mask):
+            return tuple(d for d in range(1, size + 1) if mask >> (d - 1) & 1)
+
+        def mask_indices(mask):
+            return tuple(k for k in range(size) if mask >> k & 1)
+
+        # candidate masks are plain ints of size bits; up to 9 digits every mask is tabulated
+        if size <= 9:
+            self.popcount = [popcount(mask) for mask in range(1 << size)]
+            self.mask_digits = [mask_digits(mask) for mask in range(1 << size)]
+            self.mask_indices = [mask_indices(mask) for mask in range(1 << size)]
+        else:
+            self.popcount = MaskTable(popcount)
+            self.mask_digits = MaskTable(mask_digits)
+            self.mask_indices = MaskTable(mask_indices)
+
+        self.rows = tuple(tuple(range(size * r, size * r + size)) for r in range(size))
+        self.cols = tuple(tuple(range(c, cells, size)) for c in range(size))
+        self.boxes = tuple(
+            tuple(size * (box * (b // box) + i) + box * (b % box) + j for i in range(box) for j in range(box))
+            for b in range(size)
+        )
+        self.lines = self.rows + self.cols
+        self.units = self.rows + self.cols + self.boxes
+
+        # (row, col, box) of each cell, and the indices of its three units in units
+        self.cell_positions = tuple(
+            (i // size, i % size, box * (i // (size * box)) + i % size // box) for i in range(cells)
+        )
+        self.cell_units = tuple((r, size + c, 2 * size + b) for r, c, b in self.cell_positions)
+        self.cell_names = tuple(f"r{r + 1}c{c + 1}" for r, c, b in self.cell_positions)
+        # (unit, position of the cell within that unit) for the three units of each cell
+        self.cell_slots = tuple(
+            ((r, c), (size + c, r), (2 * size + b, box * (r % box) + c % box)) for r, c, b in self.cell_positions
+        )
+
+        # the cells sharing a row, column or box with each cell
+        self.peers = tuple(
+            tuple(sorted({j for u in self.cell_units[i] for j in self.units[u]} - {i}))
+            for i in range(cells)
+        )
+        self.peer_bits = tuple(sum(1 << p for p in peers) for peers in self.peers)
+
+        # changes are tracked as one digit mask per unit, packed unit-major into a single int;
+        # multiplying a digit mask by a cell's spread marks those digits in all three of its units
+        self.cell_unit_spread = tuple(sum(1 << size * u for u in units) for units in self.cell_units)
+        self.digit_spread = [0] + [
+            sum(self.digit_bit[d] << size * u for u in range(3 * size)) for d in range(1, size + 1)
+        ]
+        self.all_changed = (1 << size * 3 * size) - 1
+        self.box_lines, self.line_boxes = self.build_intersections()
+
+    def build_intersections(self):
+        # box -> (mask of the box positions on a line, line cells outside the box), rows first
+        box_lines = tuple([] for _ in range(self.size))
+        # line -> (mask of the line positions inside a box, box cells off the line)
+        line_boxes = tuple([] for _ in range(2 * self.size))
+
+        for line, line_cells in enumerate(self.lines):
+            for box, box_cells in enumerate(self.boxes):
+                common = set(line_cells) & set(box_cells)
+                if not common:
+                    continue
+                box_mask = sum(1 << k for k, i in enumerate(box_cells) if i in common)
+                line_mask = sum(1 << k for k, i in enumerate(line_cells) if i in common)
+                box_lines[box].append((box_mask, tuple(i for i in line_cells if i not in common)))
+                line_boxes[line].append((line_mask, tuple(i for i in box_cells if i not in common)))
+
+        return tuple(map(tuple, box_lines)), tuple(map(tuple, line_boxes))
+
+GEOMETRIES = {}
+
+# 3 for the standard 9x9 board, 4 for 16x16, 5 for 25x25
+def geometry(box):
+    geo = GEOMETRIES.get(box)
+    if geo is None:
+        geo = GEOMETRIES[box] = Geometry(box)
+    return geo
+
+# the 9x9 tables that BoardBatch and the generator read, under their own names; anything
+# else takes them from STANDARD
+STANDARD = geometry(3)
+ALL_DIGITS, DIGIT_BIT, POPCOUNT = STANDARD.all_digits, STANDARD.digit_bit, STANDARD.popcount
+MASK_DIGITS, CELL_UNITS, PEERS = STANDARD.mask_digits, STANDARD.cell_units, STANDARD.peers
+BOXES, LINES, UNITS = STANDARD.boxes, STANDARD.lines, STANDARD.units
+
+# technique ids in solve() order, with the difficulty each step adds
+(HIDDEN_SINGLE, NAKED_SINGLE, POINTING, BOX_LINE, HIDDEN_PAIR, NAKED_PAIR, X_WING,
+ NAKED_TRIPLE, HIDDEN_TRIPLE, SWORDFISH, XY_WING, SIMPLE_COLORING, X_CHAIN, NAKED_QUAD,
+ JELLYFISH, HIDDEN_QUAD) = range(16)
+TECHNIQUE_NAMES = (
+    "hidden single", "naked single", "pointing pair/triple", "box-line reduction", "hidden pair",
+    "naked pair", "X-Wing", "naked triple", "hidden triple", "swordfish", "XY-Wing",
+    "simple coloring", "X-Chain", "naked quad", "jellyfish", "hidden quad",
+)
+TECHNIQUE_WEIGHTS = (1.5, 2.3, 2.6, 2.8, 3.4, 3.0, 3.2, 3.6, 4.0, 4.2, 4.2, 4.5, 4.8, 5.0, 5.2, 5.4)
+
+# bump when a technique starts finding something different; stored grades are keyed on
+# this together with the names and weights above
+TECHNIQUE_REVISION = 1
+TECHNIQUE_VERSION = hashlib.sha1(
+    repr((TECHNIQUE_REVISION, TECHNIQUE_NAMES, TECHNIQUE_WEIGHTS)).encode()
+).hexdigest()[:16]
+
+def bit_indices(bits):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+def lowest_digit(mask):
+    return (mask & -mask).bit_length()
+
+def digits_to_mask(digits):
+    mask = 0
+    for d in digits:
+        mask |= 1 << (d - 1)
+    return mask
+
+def puzzle_digits(puzzle):
+    digits = puzzle.strip().replace(".", "0")
+    if len(digits) != 81 or not digits.isdigit():
+        raise ValueError(f"expected 81 digits, got {puzzle!r}")
+    return digits
+
+# Larger boards write 10 to 25 as A to P, so a cell is always one character.
+DIGIT_CHARS = "0123456789ABCDEFGHIJKLMNOP"
+BOARD_CELLS = {81: 3, 256: 4, 625: 5}
+
+# flat cell values of a 9x9, 16x16 or 25x25 puzzle, with 0 or . for blanks
+def puzzle_values(puzzle):
+    text = puzzle.strip().upper().replace(".", "0")
+    box = BOARD_CELLS.get(len(text))
+    if box is None:
+        raise ValueError(f"expected 81, 256 or 625 cells, got {puzzle!r}")
+    values = [DIGIT_CHARS.find(char) for char in text]
+    if not 0 <= min(values) <= max(values) <= box * box:
+        raise ValueError(f"unexpected character in {puzzle!r}")
+    return values
+
+# Yields (mask of chosen items, union of their masks) for every choice of size items from
+# (item, mask) pairs whose masks together span exactly size bits. A partial choice is
+# dropped as soon as its union grows past size bits. popcount is the table for the masks.
+def find_covers(items, size, popcount=POPCOUNT, start=0, chosen=0, union=0, depth=0):
+    for j in range(start, len(items) - (size - depth - 1)):
+        item, mask = items[j]
+        combined = union | mask
+        if popcount[combined] > size:
+            continue
+        if depth + 1 == size:
+            if popcount[combined] == size:
+                yield chosen | 1 << item, combined
+        elif depth + 2 == size:
+            for last, last_mask in items[j + 1:]:
+                if popcount[combined | last_mask] == size:
+                    yield chosen | 1 << item | 1 << last, combined | last_mask
+        else:
+            yield from find_covers(items, size, popcount, j + 1, chosen | 1 << item, combined, depth + 1)
+
+# Conjugate pairs (a digit with exactly two places in a unit: a strong link between them)
+# and bivalue cells. A board keeps one between technique runs and refresh() recomputes only
+# the unit/digit pairs changed since: each technique's board.changed covers everything
+# since it last ran, which includes everything since any technique last refreshed.
+class LinkGraph:
+    __slots__ = ("geo", "conjugates", "bivalue")
+
+    def __init__(self, geo=STANDARD):
+        self.geo = geo
+        # conjugates[size * u + k]: the two cells of unit u that can hold digit k + 1, or None
+        self.conjugates = [None] * 3 * geo.size * geo.size
+        self.bivalue = set()
+
+    def refresh(self, cands, changed):
+        conjugates, bivalue = self.conjugates, self.bivalue
+        size, all_digits, popcount = self.geo.size, self.geo.all_digits, self.geo.popcount
+        for u, unit in enumerate(self.geo.units):
+            digits = changed >> size * u & all_digits
+            if not digits:
+                continue
+            # bit-parallel count of places per digit, saturating at three
+            once = twice = thrice = 0
+            for i in unit:
+                mask = cands[i]
+                thrice |= twice & mask
+                twice |= once & mask
+                once |= mask
+                if popcount[mask] == 2:
+                    bivalue.add(i)
+                else:
+                    bivalue.discard(i)
+            pairs = twice & ~thrice
+            for k in self.geo.mask_indices[digits]:
+                if pairs >> k & 1:
+                    a, b = [i for i in unit if cands[i] >> k & 1]
+                    conjugates[size * u + k] = (a, b)
+                else:
+                    conjugates[size * u + k] = None
+
+    # cell -> cells it is strongly linked to for digit
+    def strong_links(self, digit):
+        links = {}
+        size = self.geo.size
+        for u in range(3 * size):
+            pair = self.conjugates[size * u + digit - 1]
+            if pair is not None:
+                a, b = pair
+                links.setdefault(a, []).append(b)
+                links.setdefault(b, []).append(a)
+        return links
+
+class SudokuContradiction(Exception):
+    pass
+
+# raised inside solve() when its budget runs out; the message is the reason
+class SolveInterrupted(Exception):
+    pass
+
+# Set cancelled from another thread (or an event loop callback) to stop a running solve()
+# at its next check. A token is not shared between processes.
+class CancelToken:
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+# Limits for one solve() call: technique steps, eliminated candidates, seconds from the
+# start of the call, an absolute time.monotonic() deadline and a CancelToken; None means
+# no limit. solve() resets the counters, so one budget can serve many boards in turn.
+class SolveBudget:
+    __slots__ = ("max_steps", "max_eliminations", "timeout", "deadline", "token", "steps", "eliminations",
+                 "stop_at")
+
+    def __init__(self, max_steps=None, max_eliminations=None, timeout=None, deadline=None, token=None):
+        self.max_steps = max_steps
+        self.max_eliminations = max_eliminations
+        self.timeout = timeout
+        self.deadline = deadline
+        self.token = token
+        self.steps = self.eliminations = 0
+        self.stop_at = deadline
+
+    def start(self):
+        self.steps = self.eliminations = 0
+        self.stop_at = self.deadline
+        if self.timeout is not None:
+            end = time.monotonic() + self.timeout
+            self.stop_at = end if self.stop_at is None else min(self.stop_at, end)
+        self.check()
+        self.check_counts()
+
+    def check(self):
+        if self.token is not None and self.token.cancelled:
+            raise SolveInterrupted("cancelled")
+        if self.stop_at is not None and time.monotonic() >= self.stop_at:
+            raise SolveInterrupted("deadline")
+
+    def spend(self, digits, placed):
+        self.steps += 1
+        if not placed:
+            self.eliminations += popcount(digits)
+        self.check_counts()
+
+    def check_counts(self):
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            raise SolveInterrupted("max steps")
+        if self.max_eliminations is not None and self.eliminations >= self.max_eliminations:
+            raise SolveInterrupted("max eliminations")
+
+# Records solve steps for later inspection. Any object with a matching step() method can
+# be used as a board's trace; boards without one pay a single None check per step.
+class TraceBuffer:
+    STEP = struct.Struct("<BHIBf")
+
+    def __init__(self, capacity=1024):
+        self.data = bytearray(capacity * self.STEP.size)
+        self.count = 0
+
+    def step(self, technique, cell, digits, placed, delta):
+        offset = self.count * self.STEP.size
+        if offset == len(self.data):
+            self.data.extend(bytes(len(self.data) or self.STEP.size))
+        self.STEP.pack_into(self.data, offset, technique, cell, digits, placed, delta)
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return self.STEP.iter_unpack(self.to_bytes())
+
+    def clear(self):
+        self.count = 0
+
+    def to_bytes(self):
+        return bytes(self.data[:self.count * self.STEP.size])
+
+    @classmethod
+    def from_bytes(cls, data):
+        trace = cls(0)
+        trace.data = bytearray(data)
+        trace.count = len(data) // cls.STEP.size
+        return trace
+
+    # box is the box size of the board the steps came from
+    def write_jsonl(self, file, box=3):
+        import json
+
+        geo = geometry(box)
+        for technique, cell, digits, placed, delta in self:
+            file.write(json.dumps({
+                "technique": TECHNIQUE_NAMES[technique],
+                "cell": geo.cell_names[cell],
+                "action": "place" if placed else "eliminate",
+                "digits": list(geo.mask_digits[digits]),
+                "delta": round(delta, 2),
+            }) + "\n")
+
+# Per-technique counters for profiling solve(). Attach one to any number of boards and
+# merge the results from other boards or batch workers with merge()/+=.
+class TechniqueStats:
+    FIELDS = ("calls", "hits", "eliminated", "placed", "wall", "cpu")
+
+    def __init__(self):
+        count = len(TECHNIQUE_NAMES)
+        self.calls = [0] * count
+        self.hits = [0] * count
+        self.eliminated = [0] * count
+        self.placed = [0] * count
+        self.wall = [0.0] * count
+        self.cpu = [0.0] * count
+
+    def step(self, technique, cell, digits, placed, delta):
+        if placed:
+            self.placed[technique] += 1
+        else:
+            self.eliminated[technique] += popcount(digits)
+
+    def timed(self, technique, found, wall, cpu):
+        self.calls[technique] += 1
+        if found:
+            self.hits[technique] += 1
+        self.wall[technique] += wall
+        self.cpu[technique] += cpu
+
+    def merge(self, other):
+        for field in self.FIELDS:
+            totals = getattr(self, field)
+            for k, value in enumerate(getattr(other, field)):
+                totals[k] += value
+        return self
+
+    __iadd__ = merge
+
+    def as_dict(self):
+        return {
+            name: {field: getattr(self, field)[k] for field in self.FIELDS}
+            for k, name in enumerate(TECHNIQUE_NAMES)
+        }
+
+    def table(self):
+        lines = [f"{'technique':<20} {'calls':>8} {'hits':>8} {'elim':>8} {'placed':>8} {'wall ms':>9} {'cpu ms':>9}"]
+        for k, name in enumerate(TECHNIQUE_NAMES):
+            lines.append(
+                f"{name:<20} {self.calls[k]:>8} {self.hits[k]:>8} {self.eliminated[k]:>8} "
+                f"{self.placed[k]:>8} {self.wall[k] * 1000:>9.2f} {self.cpu[k] * 1000:>9.2f}"
+            )
+        return "\n".join(lines)
+
+# Number of steps each technique took; used as a board's trace when the full trace is not needed.
+class TechniqueCounts:
+    __slots__ = ("counts",)
+
+    def __init__(self):
+        self.counts = [0] * len(TECHNIQUE_NAMES)
+
+    def step(self, technique, cell, digits, placed, delta):
+        self.counts[technique] += 1
+
+    # id of the last technique in solve() order that took a step, or -1
+    def hardest(self):
+        return max((k for k, count in enumerate(self.counts) if count), default=-1)
+
+class SudokuCell:
+    __slots__ = ("board", "index")
+
+    def __init__(self, board, index):
+        self.board = board
+        self.index = index
+
+    @property
+    def value(self):
+        return self.board.values[self.index]
+
+    @value.setter
+    def value(self, value):
+        self.board.values[self.index] = value
+
+    # a frozenset, so edits have to go through the setter: cell.candidates -= {d}
+    @property
+    def candidates(self):
+        return frozenset(self.board.geo.mask_digits[self.board.cands[self.index]])
+
+    # removes the missing digits with board.eliminate(), so snapshots and change tracking
+    # see them; candidates can only be taken away
+    @candidates.setter
+    def candidates(self, digits):
+        board, i = self.board, self.index
+        mask = digits_to_mask(digits)
+        if mask & ~board.cands[i]:
+            raise ValueError(f"cannot add candidates to {board.geo.cell_names[i]}")
+        board.eliminate(i, board.cands[i] & ~mask)
+
+# rows, columns then boxes as lists of cell views, like board.grid; the techniques use
+# board.geo.units, the same units as tuples of cell indices
+def get_all_units(board):
+    return [[SudokuCell(board, i) for i in unit] for unit in board.geo.units]
+
+# exact search used when the techniques stall: depth-first over copies of the value and
+# candidate arrays, branching on the cell with the fewest candidates after propagating singles
+def propagate(values, cands, queue, geo=STANDARD):
+    digit_bit, peers, popcount = geo.digit_bit, geo.peers, geo.popcount
+    while True:
+        while queue:
+            i, digit = queue.pop()
+            bit = digit_bit[digit]
+            if values[i]:
+                if values[i] != digit:
+                    return False
+                continue
+            if not cands[i] & bit:
+                return False
+
+            values[i] = digit
+            cands[i] = 0
+            for p in peers[i]:
+                mask = cands[p]
+                if mask & bit:
+                    mask &= ~bit
+                    if not mask:
+                        return False
+                    cands[p] = mask
+                    if not mask & (mask - 1):
+                        queue.append((p, lowest_digit(mask)))
+
+        for unit in geo.units:
+            once = twice = placed = 0
+            for i in unit:
+                mask = cands[i]
+                twice |= once & mask
+                once |= mask
+                placed |= digit_bit[values[i]]
+            if once | placed != geo.all_digits:
+                return False
+            for digit in geo.mask_digits[once & ~twice]:
+                bit = digit_bit[digit]
+                for i in unit:
+                    if cands[i] & bit:
+                        queue.append((i, digit))
+                        break
+
+        if not queue:
+            return True
+
+def search_branch(values, cands, limit, found, geo=STANDARD, budget=None):
+    if budget is not None:
+        budget.check()
+    best, best_count = -1, geo.size + 1
+    popcount = geo.popcount
+    for i in range(geo.cells):
+        if not values[i]:
+            count = popcount[cands[i]]
+            if count < best_count:
+                best, best_count = i, count
+                if count == 2:
+                    break
+
+    if best < 0:
+        found[0] += 1
+        if found[1] is None:
+            found[1] = values[:]
+        return found[0] >= limit
+
+    for digit in geo.mask_digits[cands[best]]:
+        branch_values, branch_cands = values[:], cands[:]
+        if propagate(branch_values, branch_cands, [(best, digit)], geo):
+            if search_branch(branch_values, branch_cands, limit, found, geo, budget):
+                return True
+    return False
+
+# returns (number of solutions found, stopping at limit, first solution or None); a budget
+# is checked at every node and raises SolveInterrupted when it runs out
+def search(values, cands, limit=1, geo=STANDARD, budget=None):
+    values, cands = list(values), list(cands)
+    if any(not value and not mask for value, mask in zip(values, cands)):
+        return 0, None
+
+    queue = [(i, lowest_digit(mask)) for i, mask in enumerate(cands) if mask and not mask & (mask - 1)]
+    found = [0, None]
+    if propagate(values, cands, queue, geo):
+        search_branch(values, cands, limit, found, geo, budget)
+    return found[0], found[1]
+
+def repeats_digit(values, geo=STANDARD):
+    digit_bit = geo.digit_bit
+    for unit in geo.units:
+        seen = 0
+        for i in unit:
+            bit = digit_bit[values[i]]
+            if seen & bit:
+                return True
+            seen |= bit
+    return False
+
+# candidate masks left by the placed values; filled cells get 0
+def value_candidates(values, geo=STANDARD):
+    rows = [0] * geo.size
+    cols = [0] * geo.size
+    boxes = [0] * geo.size
+    for value, (r, c, b) in zip(values, geo.cell_positions):
+        if value:
+            bit = geo.digit_bit[value]
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+
+    all_digits = geo.all_digits
+    cands = [0] * geo.cells
+    for i, (r, c, b) in enumerate(geo.cell_positions):
+        if values[i] == 0:
+            cands[i] = all_digits & ~(rows[r] | cols[c] | boxes[b])
+    return cands
+
+class SudokuBoard:
+    __slots__ = ("geo", "values", "cands", "difficulty", "contradiction", "changed", "touched", "searched", "trace",
+                 "stats", "links", "trail", "budget", "stopped")
+
+    # grid is a square list of rows of 9, 16 or 25 values; the box size follows from it
+    def __init__(self, grid, trace=None, stats=None):
+        self.values = [value for row in grid for value in row]
+        box = BOARD_CELLS.get(len(self.values))
+        if box is None:
+            raise ValueError(f"expected 81, 256 or 625 cells, got {len(self.values)}")
+        self.geo = geometry(box)
+        self.cands = [0] * self.geo.cells
+        self.update_all_candidates()
+        self.difficulty = 0
+        self.contradiction = self.find_contradiction()
+        # unit/digit pairs the running technique has to look at, and those modified while it runs
+        self.changed = self.geo.all_changed
+        self.touched = 0
+        self.searched = False
+        self.trace = trace
+        self.stats = stats
+        self.links = None
+        # (cell, value, candidates) before each change, recorded while a snapshot is open
+        self.trail = None
+        # the SolveBudget of a running solve(), and why the last solve() stopped early
+        self.budget = None
+        self.stopped = None
+
+    @classmethod
+    def from_string(cls, puzzle, trace=None, stats=None):
+        return cls((puzzle_values(puzzle),), trace, stats)
+
+    # values is any sequence of 81, 256 or 625 ints, e.g. a record from puzzle_records()
+    @classmethod
+    def from_values(cls, values, trace=None, stats=None):
+        return cls((values,), trace, stats)
+
+    def to_string(self):
+        return "".join([DIGIT_CHARS[value] for value in self.values])
+
+    @property
+    def grid(self):
+        return [[SudokuCell(self, i) for i in row] for row in self.geo.rows]
+
+    def update_all_candidates(self):
+        self.cands[:] = value_candidates(self.values, self.geo)
+
+    def find_contradiction(self):
+        values, cands, geo = self.values, self.cands, self.geo
+        # quick pass for the usual case; the cell by cell scan below names the problem
+        if all(value or mask for value, mask in zip(values, cands)) and not repeats_digit(values, geo):
+            return None
+
+        for i in range(geo.cells):
+            if values[i] == 0:
+                if not cands[i]:
+                    return f"no candidates left for {geo.cell_names[i]}"
+            elif any(values[p] == values[i] for p in geo.peers[i]):
+                return f"duplicate {values[i]} at {geo.cell_names[i]}"
+        return None
+
+    def place(self, row, col, digit):
+        self.place_cell(self.geo.rows[row][col], digit)
+
+    def place_cell(self, i, digit):
+        values, cands, geo = self.values, self.cands, self.geo
+        bit = geo.digit_bit[digit]
+        if not cands[i] & bit:
+            if values[i] == digit:
+                return
+            if values[i]:
+                raise SudokuContradiction(f"{geo.cell_names[i]} already holds {values[i]}")
+            if any(values[p] == digit for p in geo.peers[i]):
+                raise SudokuContradiction(f"duplicate {digit} at {geo.cell_names[i]}")
+            raise SudokuContradiction(f"{digit} is not a candidate for {geo.cell_names[i]}")
+
+        trail = self.trail
+        if trail is not None:
+            trail.append((i, 0, cands[i]))
+        cell_unit_spread = geo.cell_unit_spread
+        touched = cands[i] * cell_unit_spread[i]
+        values[i] = digit
+        cands[i] = 0
+        spread = 0
+        for p in geo.peers[i]:
+            mask = cands[p]
+            if mask & bit:
+                if mask == bit:
+                    raise SudokuContradiction(f"no candidates left for {geo.cell_names[p]}")
+                if trail is not None:
+                    trail.append((p, 0, mask))
+                cands[p] = mask & ~bit
+                spread |= cell_unit_spread[p]
+        self.touched |= touched | spread * bit
+
+    def eliminate(self, i, mask):
+        old = self.cands[i]
+        remaining = old & ~mask
+        if not remaining and self.values[i] == 0:
+            raise SudokuContradiction(f"no candidates left for {self.geo.cell_names[i]}")
+        if self.trail is not None:
+            self.trail.append((i, self.values[i], old))
+        self.cands[i] = remaining
+        self.touched |= (old & mask) * self.geo.cell_unit_spread[i]
+
+    # Marks the current state; restore(mark) undoes every placement and elimination made
+    # since, in time proportional to the number of changes. Snapshots nest.
+    def snapshot(self):
+        if self.trail is None:
+            self.trail = []
+        return len(self.trail), self.difficulty, self.contradiction, self.searched
+
+    def restore(self, mark):
+        length, self.difficulty, self.contradiction, self.searched = mark
+        values, cands, trail = self.values, self.cands, self.trail
+        digit_bit, cell_unit_spread = self.geo.digit_bit, self.geo.cell_unit_spread
+        touched = 0
+        while len(trail) > length:
+            i, value, mask = trail.pop()
+            touched |= (mask ^ cands[i] | digit_bit[values[i]]) * cell_unit_spread[i]
+            values[i] = value
+            cands[i] = mask
+        self.touched |= touched
+
+    # stops recording; marks taken before are no longer valid
+    def release(self):
+        self.trail = None
+
+    # with board.branch(): ... tries something out and rolls it back on exit
+    @contextmanager
+    def branch(self):
+        mark = self.snapshot()
+        try:
+            yield self
+        finally:
+            self.restore(mark)
+
+    def record(self, technique, cell, digits, placed=False):
+        delta = TECHNIQUE_WEIGHTS[technique]
+        self.difficulty += delta
+        if self.trace is not None:
+            self.trace.step(technique, cell, digits, placed, delta)
+        if self.stats is not None:
+            self.stats.step(technique, cell, digits, placed, delta)
+        if self.budget is not None:
+            self.budget.spend(digits, placed)
+
+    # called between technique passes and inside the longer technique loops
+    def check_budget(self):
+        if self.budget is not None:
+            self.budget.check()
+
+    def link_graph(self):
+        if self.links is None:
+            self.links = LinkGraph(self.geo)
+            self.links.refresh(self.cands, self.geo.all_changed)
+        else:
+            self.links.refresh(self.cands, self.changed | self.touched)
+        return self.links
+
+    def digit_cells(self, digit):
+        bit = self.geo.digit_bit[digit]
+        return sum(1 << i for i, mask in enumerate(self.cands) if mask & bit)
+
+    def changed_digits(self, unit):
+        return (self.changed | self.touched) >> self.geo.size * unit & self.geo.all_digits
+
+    def digit_changed(self, digit):
+        return (self.changed | self.touched) & self.geo.digit_spread[digit]
+
+    def get_candidates_mask(self, row, col):
+        geo = self.geo
+        if self.values[geo.rows[row][col]] != 0:
+            return 0
+        used = 0
+        for d in self.get_row_values(row) | self.get_col_values(col) | self.get_box_values(row, col):
+            used |= geo.digit_bit[d]
+        return geo.all_digits & ~used
+
+    def get_candidates(self, row, col):
+        return set(self.geo.mask_digits[self.get_candidates_mask(row, col)])
+
+    def get_row_values(self, row):
+        return {self.values[i] for i in self.geo.rows[row] if self.values[i] != 0}
+
+    def get_col_values(self, col):
+        return {self.values[i] for i in self.geo.cols[col] if self.values[i] != 0}
+
+    def get_box_values(self, row, col):
+        geo = self.geo
+        return {self.values[i] for i in geo.boxes[geo.cell_positions[geo.rows[row][col]][2]] if self.values[i] != 0}
+
+    def is_solved(self):
+        return 0 not in self.values
+
+    def get_possible_candidates(board, row, col):
+        return board.get_candidates(row, col)
+
+    def apply_naked_singles(board):
+        progress = False
+        values, cands, popcount = board.values, board.cands, board.geo.popcount
+        for row, cells in enumerate(board.geo.rows):
+            if not board.changed_digits(row):
+                continue
+            for i in cells:
+                if values[i] == 0 and popcount[cands[i]] == 1:
+                    bit = cands[i]
+                    board.place_cell(i, lowest_digit(bit))
+                    board.record(NAKED_SINGLE, i, bit, True)
+                    progress = True
+        return progress
+
+    def apply_hidden_singles(board):
+        progress = False
+        values, cands, geo = board.values, board.cands, board.geo
+        for u, unit in enumerate(geo.units):
+            changed = board.changed_digits(u)
+            if not changed:
+                continue
+
+            masks = [cands[i] if values[i] == 0 else 0 for i in unit]
+            once = twice = 0
+            for mask in masks:
+                twice |= once & mask
+                once |= mask
+
+            singles = once & ~twice & changed
+            if not singles:
+                continue
+
+            for digit in geo.mask_digits[singles]:
+                bit = geo.digit_bit[digit]
+                for i, mask in zip(unit, masks):
+                    if mask & bit:
+                        board.place_cell(i, digit)
+                        board.record(HIDDEN_SINGLE, i, bit, True)
+                        break
+                progress = True
+        return progress
+
+    def apply_pointing_pairs_triples(board):
+        progress = False
+        cands, geo = board.cands, board.geo
+
+        for box, box_cells in enumerate(geo.boxes):
+            changed = board.changed_digits(2 * geo.size + box)
+            if not changed:
+                continue
+
+            positions = [0] * (geo.size + 1)
+            for k, i in enumerate(box_cells):
+                for d in geo.mask_digits[cands[i]]:
+                    positions[d] |= 1 << k
+
+            for digit in geo.mask_digits[changed]:
+                if 2 <= geo.popcount[positions[digit]] <= geo.box:
+                    bit = geo.digit_bit[digit]
+                    for line_mask, line_rest in geo.box_lines[box]:
+                        if positions[digit] & ~line_mask:
+                            continue
+                        for i in line_rest:
+                            if cands[i] & bit:
+                                board.eliminate(i, bit)
+                                board.record(POINTING, i, bit)
+                                progress = True
+
+        return progress
+
+    def apply_box_line_reduction(board):
+        progress = False
+        cands, geo = board.cands, board.geo
+
+        for line, line_cells in enumerate(geo.lines):
+            changed = board.changed_digits(line)
+            if not changed:
+                continue
+
+            positions = [0] * (geo.size + 1)
+            for k, i in enumerate(line_cells):
+                for d in geo.mask_digits[cands[i]]:
+                    positions[d] |= 1 << k
+
+            for digit in geo.mask_digits[changed]:
+                if 2 <= geo.popcount[positions[digit]] <= geo.box:
+                    bit = geo.digit_bit[digit]
+                    for box_mask, box_rest in geo.line_boxes[line]:
+                        if positions[digit] & ~box_mask:
+                            continue
+                        for i in box_rest:
+                            if cands[i] & bit:
+                                board.eliminate(i, bit)
+                                board.record(BOX_LINE, i, bit)
+                                progress = True
+
+        return progress
+
+    # A naked subset is n cells of a unit whose candidates span n digits: those digits can be
+    # removed from the rest of the unit. A hidden subset is n digits confined to n cells of
+    # a unit: every other digit can be removed from those cells.
+    def apply_subsets(board, size, hidden, technique):
+        progress = False
+        cands, geo = board.cands, board.geo
+        popcount, cell_slots, mask_indices = geo.popcount, geo.cell_slots, geo.mask_indices
+
+        # items per unit, gathered in one pass over the cells: (digit, positions) for hidden
+        # subsets, (position, candidates) for naked ones, keeping only those small enough
+        if hidden:
+            unit_positions = [[0] * geo.size for _ in geo.units]
+            for i, mask in enumerate(cands):
+                for u, k in cell_slots[i]:
+                    positions = unit_positions[u]
+                    for d in mask_indices[mask]:
+                        positions[d] |= 1 << k
+            unit_items = [
+                [(d, mask) for d, mask in enumerate(positions) if 0 < popcount[mask] <= size]
+                for positions in unit_positions
+            ]
+        else:
+            unit_items = [[] for _ in geo.units]
+            for i, mask in enumerate(cands):
+                if 0 < popcount[mask] <= size:
+                    for u, k in cell_slots[i]:
+                        unit_items[u].append((k, mask))
+
+        for u, unit in enumerate(geo.units):
+            items = unit_items[u]
+            if len(items) < size:
+                continue
+            changed = board.changed_digits(u)
+            if not changed:
+                continue
+            board.check_budget()
+
+            for chosen, union in find_covers(items, size, popcount):
+                if hidden:
+                    # only digits that changed in this unit can have formed a new subset
+                    if not chosen & changed:
+                        continue
+                    cells, mask = [unit[k] for k in mask_indices[union]], ~chosen
+                else:
+                    cells, mask = [i for k, i in enumerate(unit) if not chosen >> k & 1], union
+
+                for i in cells:
+                    removed = cands[i] & mask
+                    if removed:
+                        board.eliminate(i, removed)
+                        board.record(technique, i, removed)
+                        progress = True
+
+        return progress
+
+    def apply_naked_pairs(board):
+        return board.apply_subsets(2, False, NAKED_PAIR)
+
+    def apply_hidden_pairs(board):
+        return board.apply_subsets(2, True, HIDDEN_PAIR)
+
+    def apply_naked_triples(board):
+        return board.apply_subsets(3, False, NAKED_TRIPLE)
+
+    def apply_hidden_triples(board):
+        return board.apply_subsets(3, True, HIDDEN_TRIPLE)
+
+    def apply_naked_quads(board):
+        return board.apply_subsets(4, False, NAKED_QUAD)
+
+    def apply_hidden_quads(board):
+        return board.apply_subsets(4, True, HIDDEN_QUAD)
+
+    # A fish of size n: n rows (columns) whose candidates for a digit lie in n columns
+    # (rows) between them. The digit can then be removed from the rest of those columns.
+    def apply_fish(board, size, technique):
+        progress = False
+        cands, geo = board.cands, board.geo
+        n, popcount, mask_indices = geo.size, geo.popcount, geo.mask_indices
+
+        # positions[k][line]: where digit k + 1 can go in each row (lines 0 to n - 1) and
+        # column (n to 2n - 1)
+        positions = [[0] * 2 * n for _ in range(n)]
+        for i, (r, c, b) in enumerate(geo.cell_positions):
+            for k in mask_indices[cands[i]]:
+                positions[k][r] |= 1 << c
+                positions[k][n + c] |= 1 << r
+
+        for digit in range(1, n + 1):
+            if not board.digit_changed(digit):
+                continue
+            board.check_budget()
+
+            bit = geo.digit_bit[digit]
+            for base, crossing in ((0, geo.cols), (n, geo.rows)):
+                lines = [
+                    (line, mask) for line, mask in enumerate(positions[digit - 1][base:base + n])
+                    if 2 <= popcount[mask] <= size
+                ]
+                for chosen, cover in find_covers(lines, size, popcount):
+                    for k in mask_indices[cover]:
+                        for line, i in enumerate(crossing[k]):
+                            if not chosen >> line & 1 and cands[i] & bit:
+                                board.eliminate(i, bit)
+                                board.record(technique, i, bit)
+                                progress = True
+
+        return progress
+
+    # A bivalue pivot {x, y} seeing bivalue wings {x, z} and {y, z}: whichever digit the
+    # pivot takes, one wing is z, so z goes from every cell seeing both wings.
+    def apply_xy_wing(board):
+        progress = False
+        cands, geo = board.cands, board.geo
+        popcount, peer_bits = geo.popcount, geo.peer_bits
+        graph = board.link_graph()
+
+        for pivot in sorted(graph.bivalue):
+            board.check_budget()
+            mask = cands[pivot]
+            if popcount[mask] != 2:
+                continue
+            wings = [
+                i for i in geo.peers[pivot]
+                if i in graph.bivalue and popcount[cands[i]] == 2 and popcount[cands[i] & mask] == 1
+            ]
+            for a, b in combinations(wings, 2):
+                z = cands[a] & ~mask
+                if cands[b] & ~mask != z or cands[a] & mask == cands[b] & mask:
+                    continue
+                for i in bit_indices(peer_bits[a] & peer_bits[b]):
+                    if cands[i] & z:
+                        board.eliminate(i, z)
+                        board.record(XY_WING, i, z)
+                        progress = True
+
+        return progress
+
+    # Two-colours each chain of conjugate pairs for a digit. If two cells of one colour see
+    # each other that colour is false everywhere; a cell seeing both colours is false.
+    def apply_simple_coloring(board):
+        progress = False
+        cands, geo = board.cands, board.geo
+        peer_bits = geo.peer_bits
+        graph = board.link_graph()
+
+        for digit in range(1, geo.size + 1):
+            if not board.digit_changed(digit):
+                continue
+
+            bit = geo.digit_bit[digit]
+            links = graph.strong_links(digit)
+            colored = set()
+            for start in sorted(links):
+                if start in colored:
+                    continue
+                board.check_budget()
+
+                color = {start: 0}
+                stack = [start]
+                consistent = True
+                while stack:
+                    cell = stack.pop()
+                    for other in links[cell]:
+                        if other not in color:
+                            color[other] = 1 - color[cell]
+                            stack.append(other)
+                        elif color[other] == color[cell]:
+                            consistent = False
+                colored.update(color)
+                if not consistent:
+                    continue
+
+                groups = [0, 0]
+                seen = [0, 0]
+                for cell, c in color.items():
+                    groups[c] |= 1 << cell
+                    seen[c] |= peer_bits[cell]
+
+                false = [c for c in (0, 1) if seen[c] & groups[c]]
+                if false:
+                    targets = groups[false[0]]
+                else:
+                    targets = seen[0] & seen[1] & ~(groups[0] | groups[1])
+                for i in bit_indices(targets):
+                    if cands[i] & bit:
+                        board.eliminate(i, bit)
+                        board.record(SIMPLE_COLORING, i, bit)
+                        progress = True
+
+        return progress
+
+    # Chains for one digit alternating strong links with weak ones (any two cells sharing a
+    # unit), starting and ending on a strong link: one of the two ends holds the digit, so
+    # no cell seeing both ends can.
+    def apply_x_chain(board):
+        progress = False
+        geo = board.geo
+        peer_bits = geo.peer_bits
+        graph = board.link_graph()
+
+        for digit in range(1, geo.size + 1):
+            if not board.digit_changed(digit):
+                continue
+
+            bit = geo.digit_bit[digit]
+            links = graph.strong_links(digit)
+            linked = sum(1 << cell for cell in links)
+            cells = board.digit_cells(digit)
+            for start in sorted(links):
+                board.check_budget()
+                reached = 0
+                visited = frontier = 1 << start
+                while frontier:
+                    strong = 0
+                    for cell in bit_indices(frontier):
+                        for other in links[cell]:
+                            strong |= 1 << other
+                    strong &= ~reached
+                    reached |= strong
+                    weak = 0
+                    for cell in bit_indices(strong):
+                        weak |= peer_bits[cell]
+                    frontier = weak & linked & ~visited
+                    visited |= frontier
+
+                for end in bit_indices(reached & ~(1 << start)):
+                    for i in bit_indices(peer_bits[start] & peer_bits[end] & cells):
+                        board.eliminate(i, bit)
+                        board.record(X_CHAIN, i, bit)
+                        cells &= ~(1 << i)
+                        progress = True
+
+        return progress
+
+    def apply_x_wing(board):
+        return board.apply_fish(2, X_WING)
+
+    def apply_swordfish(board):
+        return board.apply_fish(3, SWORDFISH)
+
+    def apply_jellyfish(board):
+        return board.apply_fish(4, JELLYFISH)
+
+    def search(self, limit=1):
+        if self.contradiction is not None:
+            return 0, None
+        return search(self.values, self.cands, limit, self.geo, self.budget)
+
+    def count_solutions(self, limit=2):
+        return self.search(limit)[0]
+
+    def is_unique(self):
+        return self.count_solutions(2) == 1
+
+    def complete_by_search(self):
+        count, solution = self.search()
+        if solution is None:
+            self.contradiction = "no solution"
+            return False
+
+        for i, value in enumerate(solution):
+            if not self.values[i]:
+                self.values[i] = value
+                self.cands[i] = 0
+        self.searched = True
+        return True
+
+    # With a SolveBudget the solve can stop early: the board keeps the state reached and
+    # stopped holds the reason ("max steps", "max eliminations", "deadline", "cancelled").
+    def solve(self, search=False, budget=None):
+        techniques = [
+            self.apply_hidden_singles,
+            self.apply_naked_singles,
+            self.apply_pointing_pairs_triples,
+            self.apply_box_line_reduction,
+            self.apply_hidden_pairs,
+            self.apply_naked_pairs,
+            self.apply_x_wing,
+            self.apply_naked_triples,
+            self.apply_hidden_triples,
+            self.apply_swordfish,
+            self.apply_xy_wing,
+            self.apply_simple_coloring,
+            self.apply_x_chain,
+            self.apply_naked_quads,
+            self.apply_jellyfish,
+            self.apply_hidden_quads,
+        ]
+
+        # unit/digit pairs modified since each technique last ran; a technique that found
+        # nothing in a region cannot find anything there until that region changes
+        pending = [self.geo.all_changed] * len(techniques)
+        stats = self.stats
+        self.budget = budget
+        self.stopped = None
+
+        try:
+            if budget is not None:
+                budget.start()
+            while self.contradiction is None:
+                progress = False
+                for k, technique in enumerate(techniques):
+                    if not pending[k]:
+                        continue
+                    if budget is not None:
+                        budget.check()
+                    self.changed = pending[k]
+                    self.touched = 0
+                    if stats is None:
+                        found = technique()
+                    else:
+                        wall, cpu = time.perf_counter(), time.process_time()
+                        found = technique()
+                        stats.timed(k, found, time.perf_counter() - wall, time.process_time() - cpu)
+                    pending[k] = 0
+                    if self.touched:
+                        for j in range(len(pending)):
+                            pending[j] |= self.touched
+                    if found:
+                        progress = True
+                        break
+                if not progress:
+                    break
+            if search and self.contradiction is None and not self.is_solved():
+                self.complete_by_search()
+        except SudokuContradiction as exc:
+            self.contradiction = str(exc)
+        except SolveInterrupted as exc:
+            # a limit reached on the step that finished the board does not count
+            if not self.is_solved():
+                self.stopped = str(exc)
+        finally:
+            self.changed = self.geo.all_changed
+            self.touched = 0
+            self.budget = None
+
+        return self
+
+SolveResult = namedtuple("SolveResult", "index solution solved difficulty searched")
+
+# (solution, solved, difficulty, searched) for each puzzle; a puzzle stopped by the budget
+# comes back unsolved with the state it reached
+def solve_puzzles(puzzles, search=False, budget=None):
+    results = []
+    for puzzle in puzzles:
+        board = SudokuBoard.from_string(puzzle).solve(search, budget)
+        results.append((board.to_string(), board.is_solved(), board.difficulty, board.searched))
+    return results
+
+# what solve_many() gives a line that is not a puzzle, so one bad line cannot stop a stream
+MALFORMED_RESULT = ("0" * 81, False, 0.0, False)
+
+# the puzzle with 0 for blanks and no whitespace, or None when it is malformed
+def clean_puzzle(puzzle):
+    try:
+        values = puzzle_values(puzzle)
+    except ValueError:
+        return None
+    return "".join([DIGIT_CHARS[value] for value in values])
+
+# Looks each puzzle up in the worker's on-disk cache, then its in-memory cache, and hands
+# the rest to solve in one call. New results are written back to both, except unsolved
+# ones under a budget, which may have been cut short. engine names the solve function in
+# the cache keys, since BoardBatch grades differ a little from SudokuBoard.solve().
+def cached_chunk(start, puzzles, search, cache_size, cache_path, solve, budget=None, engine="solve"):
+    puzzles = [clean_puzzle(puzzle) for puzzle in puzzles]
+    results = [MALFORMED_RESULT if puzzle is None else None for puzzle in puzzles]
+    # both caches hold 9x9 puzzles only; larger boards are always solved
+    cacheable = [puzzle is not None and len(puzzle) == 81 for puzzle in puzzles]
+    disk = process_disk_cache(cache_path) if cache_path else None
+    if disk is not None:
+        known = disk.get_many([puzzle for puzzle, ok in zip(puzzles, cacheable) if ok], search, engine)
+        results = [known.get(puzzle) if ok else result for puzzle, ok, result in zip(puzzles, cacheable, results)]
+    stored = [result is not None or not ok for result, ok in zip(results, cacheable)]
+
+    cache = process_cache(cache_size) if cache_size else None
+    forms = {}
+    if cache is not None:
+        for k, puzzle in enumerate(puzzles):
+            if results[k] is None and cacheable[k]:
+                forms[k], results[k] = cache.lookup(puzzle, search, engine)
+
+    misses = [k for k, result in enumerate(results) if result is None]
+    if misses:
+        for k, result in zip(misses, solve([puzzles[k] for k in misses], search, budget)):
+            results[k] = result
+            if budget is not None and not result[1]:
+                stored[k] = True
+            elif k in forms:
+                cache.store(forms[k], search, result, engine)
+
+    if disk is not None:
+        for k, puzzle in enumerate(puzzles):
+            if not stored[k]:
+                disk.put(puzzle, search, results[k], engine)
+        disk.flush()
+    return [SolveResult(index, *result) for index, result in enumerate(results, start)]
+
+def solve_chunk(start, puzzles, search=False, cache_size=0, cache_path=None, budget=None):
+    return cached_chunk(start, puzzles, search, cache_size, cache_path, solve_puzzles, budget)
+
+def enumerate_chunks(items, size):
+    start = 0
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+# Chunks go to one long-lived process pool, with at most two chunks per worker in
+# flight so memory stays bounded on endless input. Results come back in input order,
+# or in completion order when ordered is false; each carries its input index.
+def map_chunks(function, items, workers, chunksize, ordered, *args):
+    workers = workers or os.cpu_count() or 1
+    chunks = enumerate_chunks(iter(items), chunksize)
+
+    if workers == 1:
+        for start, chunk in chunks:
+            yield from function(start, chunk, *args)
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    pool = ProcessPoolExecutor(workers)
+    try:
+        pending = deque()
+        for start, chunk in islice(chunks, 2 * workers):
+            pending.append(pool.submit(function, start, chunk, *args))
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [future for future in pending if future in finished]
+                for future in done:
+                    pending.remove(future)
+
+            for future in done:
+                for start, chunk in islice(chunks, 1):
+                    pending.append(pool.submit(function, start, chunk, *args))
+                yield from future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+# cache_size > 0 gives each worker an LRU cache of that many canonical puzzles;
+# cache_path shares a DiskCache between workers and runs. A SolveBudget is copied to each
+# worker and applies to every puzzle on its own, so a timeout bounds the slowest one;
+# with vectorized its timeout covers a chunk's lockstep passes together (see BoardBatch).
+# A line that is not a puzzle comes back as MALFORMED_RESULT at its index.
+def solve_many(puzzles, workers=None, chunksize=64, ordered=True, search=False, vectorized=False,
+               cache_size=0, cache_path=None, budget=None):
+    chunk = solve_batch_chunk if vectorized else solve_chunk
+    return map_chunks(chunk, puzzles, workers, chunksize, ordered, search, cache_size, cache_path, budget)
+
+def profile_chunk(start, puzzles, search=False):
+    stats = TechniqueStats()
+    for puzzle in puzzles:
+        SudokuBoard.from_string(puzzle, stats=stats).solve(search)
+    return [stats]
+
+# solves every puzzle with profiling on and returns the merged TechniqueStats
+def profile_many(puzzles, workers=None, chunksize=64, search=False):
+    stats = TechniqueStats()
+    for chunk_stats in map_chunks(profile_chunk, puzzles, workers, chunksize, False, search):
+        stats += chunk_stats
+    return stats
+
+def count_chunk(start, puzzles, limit=2):
+    results = []
+    for index, puzzle in enumerate(puzzles, start):
+        try:
+            board = SudokuBoard.from_string(puzzle)
+        except ValueError:
+            count = 0
+        else:
+            count = board.count_solutions(limit)
+        results.append((index, puzzle.strip(), count))
+    return results
+
+# yields (index, puzzle, number of solutions up to limit); malformed lines count as 0
+def count_many(puzzles, workers=None, chunksize=256, ordered=True, limit=2):
+    return map_chunks(count_chunk, puzzles, workers, chunksize, ordered, limit)
+
+# keeps only the puzzles with exactly one solution, e.g. filter_unique(open(path))
+def filter_unique(puzzles, workers=None, chunksize=256, ordered=True):
+    for index, puzzle, count in count_many(puzzles, workers, chunksize, ordered):
+        if count == 1:
+            yield puzzle
+
+# (solved, difficulty, hardest technique id or -1) for a flat list of 81 values
+def grade(values):
+    counts = TechniqueCounts()
+    board = SudokuBoard.from_values(values, trace=counts).solve()
+    return board.is_solved(), board.difficulty, counts.hardest()
+
+# three diagonal boxes share no unit, so any fill of them completes to a solution
+def random_grid(rng):
+    values = [0] * 81
+    for box in BOXES[::4]:
+        for i, digit in zip(box, rng.sample(range(1, 10), 9)):
+            values[i] = digit
+    return search(values, value_candidates(values))[1]
+
+# Digs givens out of a random solution grid in random order. A removal is kept only while
+# the puzzle stays unique and the techniques still solve it within high and without going
+# past technique; the fully dug puzzle is returned as (puzzle, difficulty, hardest, givens)
+# if it also reaches low and, when given, needs technique.
+def dig_puzzle(rng, low=0.0, high=float("inf"), technique=None):
+    puzzle = random_grid(rng)
+    floor = min(TECHNIQUE_WEIGHTS)
+    difficulty, hardest, empty = 0, -1, 0
+    for i in rng.sample(range(81), 81):
+        # every empty cell costs at least one step to fill
+        if floor * (empty + 1) > high:
+            break
+        digit = puzzle[i]
+        puzzle[i] = 0
+        cands = value_candidates(puzzle)
+        cands[i] &= ~DIGIT_BIT[digit]
+        if search(puzzle, cands)[0]:
+            puzzle[i] = digit
+            continue
+        solved, score, used = grade(puzzle)
+        if not solved or score > high or technique is not None and used > technique:
+            puzzle[i] = digit
+            continue
+        difficulty, hardest, empty = score, used, empty + 1
+
+    if difficulty < low or technique is not None and hardest != technique:
+        return None
+    return "".join(map(str, puzzle)), difficulty, hardest, 81 - empty
+
+GeneratedPuzzle = namedtuple("GeneratedPuzzle", "index puzzle difficulty hardest givens")
+
+def generate_chunk(start, attempts, seed, low, high, technique, deadline):
+    import random
+
+    results = []
+    for index in attempts:
+        if deadline is not None and time.time() >= deadline:
+            break
+        found = dig_puzzle(random.Random(f"{seed}:{index}"), low, high, technique)
+        if found is not None:
+            results.append(GeneratedPuzzle(index, *found))
+    return results
+
+# Yields GeneratedPuzzles as workers accept them, until count puzzles are out, attempts
+# grids have been tried or timeout seconds have passed; with none of those it runs on.
+# technique is a technique id or name. Attempt k always digs the same grid for a given
+# seed, so any accepted puzzle can be reproduced from its index.
+def generate_many(count=None, low=0.0, high=float("inf"), technique=None, workers=None, chunksize=8,
+                  seed=0, attempts=None, timeout=None):
+    if isinstance(technique, str):
+        technique = TECHNIQUE_NAMES.index(technique)
+    deadline = None if timeout is None else time.time() + timeout
+    indices = range(attempts) if attempts is not None else count_from(0)
+    if deadline is not None:
+        indices = takewhile(lambda index: time.time() < deadline, indices)
+
+    results = map_chunks(generate_chunk, indices, workers, chunksize, False, seed, low, high, technique, deadline)
+    try:
+        for accepted, result in enumerate(results, 1):
+            yield result
+            if accepted == count:
+                return
+    finally:
+        results.close()
+
+# Puzzle files hold one puzzle per line, digits with 0 or . for blanks; blank lines and
+# lines starting with # are skipped. PUZZLE_BYTES turns a line into its 81 cell values in
+# one translate() call; anything that is not a digit or . becomes 10.
+PUZZLE_BYTES = bytes(byte - 48 if 48 <= byte <= 57 else 0 if byte == 46 else 10 for byte in range(256))
+
+# Memory-maps path and yields one record of cell values per puzzle, 81, 256 or 625 bytes,
+# or None for a malformed line. A record can go straight to SudokuBoard.from_values().
+def puzzle_records(path):
+    with open(path, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            find, end, start = data.find, len(data), 0
+            while start < end:
+                stop = find(b"\n", start)
+                if stop < 0:
+                    stop = end
+                length = stop - start
+                if (length == 81 or length == 82 and data[stop - 1] == 13) and data[start] != 35:
+                    record = data[start:start + 81].translate(PUZZLE_BYTES)
+                    yield record if max(record) < 10 else None
+                else:
+                    line = data[start:stop].strip()
+                    if line and not line.startswith(b"#"):
+                        yield line_record(line)
+                start = stop + 1
+
+# record for one puzzle line given as str or bytes, or None if it is malformed
+def line_record(line):
+    if isinstance(line, str):
+        line = line.encode()
+    line = line.strip()
+    if len(line) == 81:
+        record = line.translate(PUZZLE_BYTES)
+        return record if max(record) < 10 else None
+    try:
+        return bytes(puzzle_values(line.decode("latin-1")))
+    except ValueError:
+        return None
+
+# the same records as puzzle_records() from any iterable of lines, e.g. sys.stdin
+def text_records(lines):
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line_record(line)
+
+# Binary results: a header, then one fixed-width record per puzzle with its input index,
+# status, difficulty, steps per technique id and the final grid as 41 bytes of nibbles,
+# high nibble first, blanks as 0. The header carries TECHNIQUE_VERSION since the
+# histogram is indexed by technique id.
+RESULT_MAGIC = b"WPSR"
+RESULT_FORMAT = 1
+RESULT_HEADER = struct.Struct("<4sHH16s")
+RESULT_RECORD = struct.Struct(f"<QBf{len(TECHNIQUE_NAMES)}H41s")
+SOLVED, SEARCHED, STALLED, CONTRADICTION, MALFORMED, STOPPED = range(6)
+STATUS_NAMES = ("solved", "searched", "stalled", "contradiction", "malformed", "stopped")
+NIBBLE_PAIRS = tuple(f"{byte >> 4}{byte & 15}" for byte in range(256))
+
+PackedResult = namedtuple("PackedResult", "index status difficulty histogram solution")
+
+def pack_values(values):
+    return bytes(high << 4 | low for high, low in zip(values[0::2], values[1::2])) + bytes((values[80] << 4,))
+
+def unpack_values(data):
+    return "".join([NIBBLE_PAIRS[byte] for byte in data])[:81]
+
+def board_status(board):
+    if board.contradiction is not None:
+        return CONTRADICTION
+    if board.stopped is not None:
+        return STOPPED
+    if not board.is_solved():
+        return STALLED
+    return SEARCHED if board.searched else SOLVED
+
+def pack_result(index, board, counts):
+    histogram = (min(count, 0xFFFF) for count in counts.counts)
+    return RESULT_RECORD.pack(index, board_status(board), board.difficulty, *histogram, pack_values(board.values))
+
+def pack_malformed(index):
+    return RESULT_RECORD.pack(index, MALFORMED, 0.0, *[0] * len(TECHNIQUE_NAMES), bytes(41))
+
+def result_header():
+    return RESULT_HEADER.pack(RESULT_MAGIC, RESULT_FORMAT, RESULT_RECORD.size, TECHNIQUE_VERSION.encode())
+
+# Solves a chunk of records and returns their packed results as one bytes object. The
+# record format holds 9x9 boards only, so larger ones come back malformed.
+def solve_records_chunk(start, records, search=False, budget=None):
+    packed = []
+    for index, record in enumerate(records, start):
+        if record is None or len(record) != 81:
+            packed.append(pack_malformed(index))
+            continue
+        counts = TechniqueCounts()
+        board = SudokuBoard.from_values(record, trace=counts).solve(search, budget)
+        packed.append(pack_result(index, board, counts))
+    return [b"".join(packed)]
+
+# the same results as PackedResults, for records of any board size
+def solve_results_chunk(start, records, search=False, budget=None):
+    results = []
+    for index, record in enumerate(records, start):
+        if record is None:
+            results.append(PackedResult(index, MALFORMED, 0.0, (0,) * len(TECHNIQUE_NAMES), "0" * 81))
+            continue
+        counts = TechniqueCounts()
+        board = SudokuBoard.from_values(record, trace=counts).solve(search, budget)
+        results.append(PackedResult(index, board_status(board), board.difficulty, tuple(counts.counts),
+                                    board.to_string()))
+    return results
+
+# Solves every puzzle in path and writes the binary results to out_path; returns the
+# number of puzzles. With ordered false records are written as chunks finish.
+def solve_file(path, out_path, workers=None, chunksize=512, ordered=True, search=False, budget=None):
+    written = 0
+    with open(out_path, "wb") as out:
+        out.write(result_header())
+        records = puzzle_records(path)
+        for packed in map_chunks(solve_records_chunk, records, workers, chunksize, ordered, search, budget):
+            out.write(packed)
+            written += len(packed) // RESULT_RECORD.size
+    return written
+
+def read_results(path):
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        magic, version, size, techniques = RESULT_HEADER.unpack_from(data)
+        if magic != RESULT_MAGIC or version != RESULT_FORMAT or size != RESULT_RECORD.size:
+            raise ValueError(f"{path} is not a version {RESULT_FORMAT} result file")
+        if techniques.decode() != TECHNIQUE_VERSION:
+            raise ValueError(f"{path} was written with technique version {techniques.decode()}")
+        yield from unpack_results(data, RESULT_HEADER.size)
+
+# PackedResults from a buffer of result records starting at offset
+def unpack_results(data, offset=0):
+    unpack, size = RESULT_RECORD.unpack_from, RESULT_RECORD.size
+    for offset in range(offset, len(data) - size + 1, size):
+        index, status, difficulty, *histogram, solution = unpack(data, offset)
+        yield PackedResult(index, status, difficulty, tuple(histogram), unpack_values(solution))
+
+# Column orders that keep stacks together: a stack order plus an order inside each stack,
+# 6 ** 4 in all. COLUMN_IMAGES[k] maps the three 3-bit stack slices of a row mask to that
+# row read in order k, first column as the highest bit.
+PERMS3 = tuple(permutations(range(3)))
+
+def build_column_orders():
+    return tuple(
+        tuple(3 * stacks[k] + PERMS3[inner[k]][i] for k in range(3) for i in range(3))
+        for stacks in PERMS3 for inner in product(range(6), repeat=3)
+    )
+
+def build_column_images(orders):
+    images = []
+    for order in orders:
+        bit = [0] * 9
+        for position, col in enumerate(order):
+            bit[col] = 1 << (8 - position)
+        images.append(tuple(
+            tuple(sum(bit[3 * s + i] for i in range(3) if v >> i & 1) for v in range(8))
+            for s in range(3)
+        ))
+    return tuple(images)
+
+# built on the first canonical_form() call; most runs never need them
+COLUMN_ORDERS = COLUMN_IMAGES = None
+
+def load_column_tables():
+    global COLUMN_ORDERS, COLUMN_IMAGES
+    if COLUMN_IMAGES is None:
+        COLUMN_ORDERS = build_column_orders()
+        COLUMN_IMAGES = build_column_images(COLUMN_ORDERS)
+
+# inner stack orders that put the set bits of a 3-bit slice last
+RIGHT_ALIGNED = tuple(
+    tuple(w for w, perm in enumerate(PERMS3) if [v >> i & 1 for i in perm] == sorted(v >> i & 1 for i in perm))
+    for v in range(8)
+)
+
+# the smallest reading of a row mask over all column orders: givens as far right as possible
+def first_row_key(mask):
+    counts = sorted(POPCOUNT[mask >> 3 * s & 7] for s in range(3))
+    return ((1 << counts[0]) - 1) << 6 | ((1 << counts[1]) - 1) << 3 | (1 << counts[2]) - 1
+
+def first_row_orders(mask):
+    slices = [mask >> 3 * s & 7 for s in range(3)]
+    orders = []
+    for k, stacks in enumerate(PERMS3):
+        a, b, c = (POPCOUNT[slices[s]] for s in stacks)
+        if a <= b <= c:
+            inner = [RIGHT_ALIGNED[slices[s]] for s in stacks]
+            orders.extend(216 * k + 36 * a + 6 * b + c for a, b, c in product(*inner))
+    return orders
+
+def next_rows(rows):
+    if len(rows) % 3:
+        band = rows[-1] // 3
+        return [r for r in range(3 * band, 3 * band + 3) if r not in rows]
+    bands = {r // 3 for r in rows}
+    return [r for r in range(9) if r // 3 not in bands]
+
+# Below 17 givens no puzzle is unique, and near-empty grids tie on so many row and column
+# orders that the search runs for minutes. Such puzzles, and any whose tied (row order,
+# column order) pairs pass CANONICAL_WORK_LIMIT, key on their own digits instead, which
+# is always sound but misses equivalent puzzles.
+CANONICAL_MIN_GIVENS = 17
+CANONICAL_WORK_LIMIT = 20_000
+
+def identity_form(digits):
+    return digits, tuple(range(81)), list(range(10))
+
+# Maps a puzzle to the smallest member of its class under digit relabelling, row and
+# column swaps inside bands and stacks, band and stack swaps and transposition. Empty
+# cells are minimized first, then digits, numbered in order of first appearance.
+# Returns (key, cells, labels): key[p] is labels.index(original[cells[p]]).
+def canonical_form(puzzle):
+    digits = puzzle_digits(puzzle)
+    if 81 - digits.count("0") < CANONICAL_MIN_GIVENS:
+        return identity_form(digits)
+    load_column_tables()
+    grids = (digits, "".join(digits[c * 9 + r] for r in range(9) for c in range(9)))
+    patterns = [
+        [sum(1 << c for c in range(9) if grid[9 * r + c] != "0") for r in range(9)]
+        for grid in grids
+    ]
+
+    best = min(first_row_key(mask) for masks in patterns for mask in masks)
+    states = [
+        (t, (r,), first_row_orders(mask))
+        for t, masks in enumerate(patterns) for r, mask in enumerate(masks)
+        if first_row_key(mask) == best
+    ]
+    if sum(len(orders) for t, rows, orders in states) > CANONICAL_WORK_LIMIT:
+        return identity_form(digits)
+
+    for _ in range(8):
+        expanded, best, work = [], None, 0
+        for t, rows, orders in states:
+            masks = patterns[t]
+            for r in next_rows(rows):
+                low, mid, high = masks[r] & 7, masks[r] >> 3 & 7, masks[r] >> 6
+                images = [
+                    image[0][low] | image[1][mid] | image[2][high]
+                    for image in map(COLUMN_IMAGES.__getitem__, orders)
+                ]
+                key = min(images)
+                if best is None or key < best:
+                    expanded, best, work = [], key, 0
+                if key == best:
+                    expanded.append((t, rows + (r,), [o for o, image in zip(orders, images) if image == key]))
+                    work += len(expanded[-1][2])
+                    if work > CANONICAL_WORK_LIMIT:
+                        return identity_form(digits)
+        states = expanded
+
+    best = None
+    for t, rows, orders in states:
+        grid = grids[t]
+        for order in orders:
+            cols = COLUMN_ORDERS[order]
+            labels = {"0": "0"}
+            key = "".join(
+                labels.setdefault(grid[9 * r + c], str(len(labels)))
+                for r in rows for c in cols
+            )
+            if best is None or key < best[0]:
+                best = key, t, rows, cols, labels
+
+    key, t, rows, cols, labels = best
+    cells = [9 * r + c for r in rows for c in cols]
+    if t:
+        cells = [i % 9 * 9 + i // 9 for i in cells]
+    original = [0] * 10
+    for digit, label in labels.items():
+        original[int(label)] = int(digit)
+    # digits missing from the puzzle take the remaining labels in increasing order
+    spare = iter(d for d in range(1, 10) if d not in original)
+    return key, tuple(cells), [0] + [d or next(spare) for d in original[1:]]
+
+def to_canonical(grid, cells, labels):
+    relabel = [0] * 10
+    for label, digit in enumerate(labels):
+        relabel[digit] = label
+    return "".join(str(relabel[int(grid[i])]) for i in cells)
+
+def from_canonical(key, cells, labels):
+    grid = ["0"] * 81
+    for p, i in enumerate(cells):
+        grid[i] = str(labels[int(key[p])])
+    return "".join(grid)
+
+# Bounded LRU cache of solve() results keyed on canonical_form(). Equivalent puzzles
+# share one entry; the stored solution is mapped back into each puzzle's own labelling.
+# The difficulty is that of the first equivalent puzzle solved, which can differ
+# slightly from a fresh grade since techniques scan units in a fixed order. Entries are
+# kept per engine ("solve" or "batch"), as the two grade the same puzzle differently.
+class SolveCache:
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # returns (form, result); result is (solution, solved, difficulty, searched) or None
+    def lookup(self, puzzle, search=False, engine="solve"):
+        form = canonical_form(puzzle)
+        key, cells, labels = form
+        entry = self.entries.get((key, search, engine))
+        if entry is None:
+            self.misses += 1
+            return form, None
+
+        self.hits += 1
+        self.entries.move_to_end((key, search, engine))
+        solution, solved, difficulty, searched = entry
+        return form, (from_canonical(solution, cells, labels), solved, difficulty, searched)
+
+    def store(self, form, search, result, engine="solve"):
+        key, cells, labels = form
+        solution, solved, difficulty, searched = result
+        self.entries[key, search, engine] = (to_canonical(solution, cells, labels), solved, difficulty, searched)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def solve(self, puzzle, search=False):
+        form, result = self.lookup(puzzle, search)
+        if result is None:
+            result = solve_puzzles([puzzle], search)[0]
+            self.store(form, search, result)
+        return result
+
+# one cache per worker process, kept for the life of the pool
+process_caches = {}
+
+def process_cache(size):
+    cache = process_caches.get(size)
+    if cache is None:
+        cache = process_caches[size] = SolveCache(size)
+    return cache
+
+# Results stored in SQLite so they survive the process, keyed by the 81-digit puzzle. WAL
+# mode lets any number of worker processes read while one writes; writes are queued and
+# committed together by flush(). Rows graded under another TECHNIQUE_VERSION are ignored,
+# and purge() deletes them. Each engine stores its grades under its own version, e.g.
+# "<version>-batch", so a BoardBatch grade is never returned for SudokuBoard.solve().
+class DiskCache:
+    def __init__(self, path, batch_size=1000, version=TECHNIQUE_VERSION):
+        self.version = version
+        self.batch_size = batch_size
+        self.pending = []
+        import sqlite3
+
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "puzzle TEXT NOT NULL, search INTEGER NOT NULL, solution TEXT NOT NULL, "
+            "solved INTEGER NOT NULL, difficulty REAL NOT NULL, searched INTEGER NOT NULL, "
+            "version TEXT NOT NULL, PRIMARY KEY (puzzle, search, version)) WITHOUT ROWID"
+        )
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def engine_version(self, engine):
+        return self.version if engine == "solve" else f"{self.version}-{engine}"
+
+    def get_many(self, puzzles, search=False, engine="solve"):
+        found = {}
+        puzzles = list(puzzles)
+        for start in range(0, len(puzzles), 500):
+            chunk = puzzles[start:start + 500]
+            rows = self.connection.execute(
+                "SELECT puzzle, solution, solved, difficulty, searched FROM results "
+                f"WHERE search = ? AND version = ? AND puzzle IN ({', '.join('?' * len(chunk))})",
+                (int(search), self.engine_version(engine), *chunk),
+            )
+            for puzzle, solution, solved, difficulty, searched in rows:
+                found[puzzle] = (solution, bool(solved), difficulty, bool(searched))
+        return found
+
+    def get(self, puzzle, search=False, engine="solve"):
+        puzzle = puzzle_digits(puzzle)
+        return self.get_many([puzzle], search, engine).get(puzzle)
+
+    def put(self, puzzle, search, result, engine="solve"):
+        solution, solved, difficulty, searched = result
+        self.pending.append((puzzle_digits(puzzle), int(search), solution, int(solved), difficulty, int(searched),
+                             self.engine_version(engine)))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            with self.connection:
+                self.connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)", self.pending)
+            self.pending = []
+
+    def purge(self):
+        self.flush()
+        with self.connection:
+            return self.connection.execute(
+                "DELETE FROM results WHERE version != ? AND version NOT LIKE ?", (self.version, f"{self.version}-%")
+            ).rowcount
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def solve(self, puzzle, search=False):
+        result = self.get(puzzle, search)
+        if result is None:
+            result = solve_puzzles([puzzle], search)[0]
+            self.put(puzzle, search, result)
+        return result
+
+process_disk_caches = {}
+
+def process_disk_cache(path):
+    cache = process_disk_caches.get(path)
+    if cache is None:
+        cache = process_disk_caches[path] = DiskCache(path)
+    return cache
+
+# Array versions of the index tables for BoardBatch. A cover of k items is a group of k
+# cells (or digits, or lines) whose candidates (or positions) together span only k bits;
+# those bits can then be removed from every other item.
+def build_array_tables():
+    cell_slots = [[9 * u + UNITS[u].index(i) for u in CELL_UNITS[i]] for i in range(81)]
+
+    segments, line_rest, box_rest = [], [], []
+    line_rest_of = [[] for _ in range(81)]
+    box_rest_of = [[] for _ in range(81)]
+    for line_cells in LINES:
+        for box_cells in BOXES:
+            common = [i for i in line_cells if i in box_cells]
+            if not common:
+                continue
+            k = len(segments)
+            segments.append(common)
+            line_rest.append([i for i in line_cells if i not in common])
+            box_rest.append([i for i in box_cells if i not in common])
+            for i in line_rest[-1]:
+                line_rest_of[i].append(k)
+            for i in box_rest[-1]:
+                box_rest_of[i].append(k)
+
+    covers = {}
+    for size in (2, 3, 4):
+        groups = list(combinations(range(9), size))
+        outside = [[g for g, group in enumerate(groups) if item not in group] for item in range(9)]
+        covers[size] = (np.array(groups, dtype=np.intp), np.array(outside, dtype=np.intp))
+
+    return {
+        "units": np.array(UNITS, dtype=np.intp),
+        "peers": np.array(PEERS, dtype=np.intp),
+        "cell_slots": np.array(cell_slots, dtype=np.intp),
+        "segments": np.array(segments, dtype=np.intp),
+        "line_rest": np.array(line_rest, dtype=np.intp),
+        "box_rest": np.array(box_rest, dtype=np.intp),
+        "line_rest_of": np.array(line_rest_of, dtype=np.intp),
+        "box_rest_of": np.array(box_rest_of, dtype=np.intp),
+        "covers": covers,
+        "shifts": np.arange(9, dtype=np.uint16),
+        "popcount": np.array(POPCOUNT, dtype=np.uint8),
+        "lowest": np.array([lowest_digit(mask) for mask in range(512)], dtype=np.uint8),
+        "digit_bit": np.array(DIGIT_BIT, dtype=np.uint16),
+    }
+
+# numpy is optional and, like the tables built from it, only loaded for the first BoardBatch
+np = ARRAYS = None
+
+def load_arrays():
+    global np, ARRAYS
+    if ARRAYS is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("BoardBatch requires numpy") from None
+        np = numpy
+        ARRAYS = build_array_tables()
+    return ARRAYS
+
+def or_reduce(masks, index):
+    return np.bitwise_or.reduce(masks[:, index], axis=-1)
+
+def unit_positions(cands):
+    shifts = ARRAYS["shifts"]
+    bits = (cands[:, ARRAYS["units"], None] >> shifts) & 1
+    return (bits << shifts[:, None]).sum(axis=2, dtype=np.uint16)
+
+def positions_to_cells(positions):
+    shifts = ARRAYS["shifts"]
+    bits = (positions[:, :, None, :] >> shifts[:, None]) & 1
+    unit_cells = (bits << shifts).sum(axis=3, dtype=np.uint16).reshape(len(positions), 243)
+    return or_reduce(unit_cells, ARRAYS["cell_slots"])
+
+def cover_removals(masks, size):
+    groups, outside = ARRAYS["covers"][size]
+    popcount = ARRAYS["popcount"]
+    chosen = masks[..., groups]
+    union = np.bitwise_or.reduce(chosen, axis=-1)
+    counts = popcount[chosen]
+    valid = (counts >= 1).all(axis=-1) & (counts <= size).all(axis=-1) & (popcount[union] == size)
+    union = union * valid
+    return np.bitwise_or.reduce(union[..., outside], axis=-1)
+
+# N boards stored as (N, 81) value and candidate mask arrays and advanced through the
+# techniques of SudokuBoard.solve() in lockstep. Every board applies the first technique
+# that makes progress for it and starts over, as in solve(), but all steps a technique
+# finds on one pass are applied at once, so difficulty differs from solve(): by 0.4% on
+# average and up to 7% on random minimal puzzles. Solutions and outcomes are the same.
+class BoardBatch:
+    def __init__(self, puzzles):
+        load_arrays()
+        digits = "".join(puzzle_digits(puzzle) for puzzle in puzzles)
+        self.values = (np.frombuffer(digits.encode(), dtype=np.uint8) - ord("0")).reshape(-1, 81)
+        self.cands = np.zeros(self.values.shape, dtype=np.uint16)
+        self.difficulty = np.zeros(len(self.values))
+        self.contradiction = np.zeros(len(self.values), dtype=bool)
+        # why the last solve() stopped early, as SudokuBoard.stopped
+        self.stopped = None
+        everything = np.arange(len(self.values))
+        self.cands[:] = ALL_DIGITS & ~self.peer_bits(self.values)
+        self.cands[self.values != 0] = 0
+        self.check(everything)
+
+    def __len__(self):
+        return len(self.values)
+
+    # digit bits placed among each cell's peers, for rows of values
+    def peer_bits(self, values):
+        return or_reduce(ARRAYS["digit_bit"][values], ARRAYS["peers"])
+
+    def check(self, index):
+        values, cands = self.values[index], self.cands[index]
+        placed = ARRAYS["digit_bit"][values]
+        unit_placed = placed[:, ARRAYS["units"]]
+        duplicate = (ARRAYS["popcount"][np.bitwise_or.reduce(unit_placed, axis=2)]
+                     < (unit_placed != 0).sum(axis=2)).any(axis=1)
+        covered = np.bitwise_or.reduce((placed | cands)[:, ARRAYS["units"]], axis=2)
+        stuck = ((values == 0) & (cands == 0)).any(axis=1) | (covered != ALL_DIGITS).any(axis=1)
+        self.contradiction[index] |= duplicate | stuck
+
+    def is_solved(self):
+        return (self.values != 0).all(axis=1) & ~self.contradiction
+
+    def unit_digit_counts(self):
+        return ARRAYS["popcount"][unit_positions(self.cands)]
+
+    def to_strings(self):
+        return ["".join(map(str, row)) for row in self.values.tolist()]
+
+    def place(self, index, technique, digits):
+        values = self.values[index]
+        digits = np.where(values == 0, digits, 0).astype(np.uint8)
+        values += digits
+        cands = self.cands[index] & ~self.peer_bits(digits)
+        cands[digits != 0] = 0
+        self.values[index] = values
+        self.cands[index] = cands
+        events = (digits != 0).sum(axis=1)
+        self.difficulty[index] += TECHNIQUE_WEIGHTS[technique] * events
+        return events > 0
+
+    # per_digit: the scalar technique records one step per removed digit instead of per cell
+    def eliminate(self, index, technique, removal, per_digit=False):
+        cands = self.cands[index]
+        removal = removal & cands
+        self.cands[index] = cands & ~removal
+        if per_digit:
+            events = ARRAYS["popcount"][removal].sum(axis=1)
+        else:
+            events = (removal != 0).sum(axis=1)
+        self.difficulty[index] += TECHNIQUE_WEIGHTS[technique] * events
+        return events > 0
+
+    def hidden_singles(self, index):
+        positions = unit_positions(self.cands[index])
+        forced = positions_to_cells(positions * (ARRAYS["popcount"][positions] == 1))
+        self.contradiction[index] |= (ARRAYS["popcount"][forced] > 1).any(axis=1)
+        return self.place(index, HIDDEN_SINGLE, ARRAYS["lowest"][forced])
+
+    def naked_singles(self, index):
+        cands = self.cands[index]
+        digits = ARRAYS["lowest"][cands] * (ARRAYS["popcount"][cands] == 1)
+        return self.place(index, NAKED_SINGLE, digits)
+
+    def intersections(self, index, technique):
+        cands = self.cands[index]
+        segments = or_reduce(cands, ARRAYS["segments"])
+        if technique == POINTING:
+            only = segments & ~or_reduce(cands, ARRAYS["box_rest"])
+            removal = or_reduce(only, ARRAYS["line_rest_of"])
+        else:
+            only = segments & ~or_reduce(cands, ARRAYS["line_rest"])
+            removal = or_reduce(only, ARRAYS["box_rest_of"])
+        return self.eliminate(index, technique, removal, per_digit=True)
+
+    def naked_subsets(self, index, technique, size):
+        cands = self.cands[index]
+        removal = cover_removals(cands[:, ARRAYS["units"]], size).reshape(len(index), 243)
+        return self.eliminate(index, technique, or_reduce(removal, ARRAYS["cell_slots"]))
+
+    def hidden_subsets(self, index, technique, size):
+        removal = cover_removals(unit_positions(self.cands[index]), size)
+        return self.eliminate(index, technique, positions_to_cells(removal))
+
+    def fish(self, index, technique, size):
+        positions = unit_positions(self.cands[index])
+        removal = np.zeros_like(positions)
+        for lines in (slice(0, 9), slice(9, 18)):
+            by_digit = positions[:, lines].transpose(0, 2, 1)
+            removal[:, lines] = cover_removals(by_digit, size).transpose(0, 2, 1)
+        return self.eliminate(index, technique, positions_to_cells(removal), per_digit=True)
+
+    # The lockstep passes count as one solve for the whole batch: the budget's deadline and
+    # token are checked between them, and once it runs out every unfinished board is left
+    # as it is. Step and elimination limits only apply to boards handed on to finish().
+    def solve(self, budget=None):
+        techniques = [
+            self.hidden_singles,
+            self.naked_singles,
+            lambda index: self.intersections(index, POINTING),
+            lambda index: self.intersections(index, BOX_LINE),
+            lambda index: self.hidden_subsets(index, HIDDEN_PAIR, 2),
+            lambda index: self.naked_subsets(index, NAKED_PAIR, 2),
+            lambda index: self.fish(index, X_WING, 2),
+            lambda index: self.naked_subsets(index, NAKED_TRIPLE, 3),
+            lambda index: self.hidden_subsets(index, HIDDEN_TRIPLE, 3),
+            lambda index: self.fish(index, SWORDFISH, 3),
+            lambda index: self.naked_subsets(index, NAKED_QUAD, 4),
+            lambda index: self.fish(index, JELLYFISH, 4),
+            lambda index: self.hidden_subsets(index, HIDDEN_QUAD, 4),
+        ]
+
+        stalled = []
+        active = np.flatnonzero(~self.is_solved() & ~self.contradiction)
+        self.stopped = None
+        try:
+            if budget is not None:
+                budget.start()
+            while active.size:
+                waiting = active
+                for technique in techniques:
+                    if not waiting.size:
+                        break
+                    waiting = waiting[~technique(waiting)]
+                stalled.extend(waiting.tolist())
+                active = np.setdiff1d(active, waiting, assume_unique=True)
+                self.check(active)
+                active = active[~self.contradiction[active] & (self.values[active] == 0).any(axis=1)]
+                if budget is not None:
+                    budget.check()
+        except SolveInterrupted as exc:
+            self.stopped = str(exc)
+            return self
+
+        # the chain techniques have no array version; boards that stall without them
+        # carry on as a SudokuBoard, where the budget applies
+        for k in stalled:
+            self.finish(k, budget)
+        return self
+
+    def finish(self, k, budget=None):
+        board = SudokuBoard.from_values(self.values[k].tolist())
+        board.cands = self.cands[k].tolist()
+        board.solve(budget=budget)
+        self.values[k] = board.values
+        self.cands[k] = board.cands
+        self.difficulty[k] += board.difficulty
+        self.contradiction[k] |= board.contradiction is not None
+
+    def results(self, start=0):
+        solved = self.is_solved().tolist()
+        difficulty = self.difficulty.tolist()
+        return [
+            SolveResult(start + k, solution, solved[k], difficulty[k], False)
+            for k, solution in enumerate(self.to_strings())
+        ]
+
+def solve_batch(puzzles, search=False, budget=None):
+    batch = BoardBatch(puzzles).solve(budget)
+    results = [result[1:] for result in batch.results()]
+    if search and batch.stopped is None:
+        for k, (solution, solved, difficulty, searched) in enumerate(results):
+            if not solved and not batch.contradiction[k]:
+                board = SudokuBoard.from_string(solution)
+                if budget is None:
+                    found = board.complete_by_search()
+                else:
+                    found = board.solve(True, budget).searched
+                if found:
+                    results[k] = (board.to_string(), True, difficulty, True)
+    return results
+
+def solve_batch_chunk(start, puzzles, search=False, cache_size=0, cache_path=None, budget=None):
+    return cached_chunk(start, puzzles, search, cache_size, cache_path, solve_batch, budget, "batch")
+
+# The example boards the solver has always shipped with, under the labels they were given.
+# The third easy and the third medium board have no solution; the benchmark corpus keeps
+# all of them as its examples tier, where those two count as invalid.
+EXAMPLE_PUZZLES = (
+    ("easy", "530290004002743500409050130000580007080024900200109000005002871090007000726800309"),
+    ("easy", "283105000010008302000230500108000400420000608700500019057090140960410850000857000"),
+    ("medium", "090510072507004001063872549708906000000100060600347008000400107005281390000030000"),
+    ("medium", "000600007078000005205000600002001340000200001800740056090860130106070508000009000"),
+    ("extreme", "002030000060000031410800070500300000090000006040208090000682004700000000000590060"),
+    ("hard", "900310000080000300200000007064800000007004200000006000000000746000050080000089020"),
+    ("easy", "001900800029653741500000030604178500087030094352046187708001309210060000003507006"),
+    ("medium", "700090201000700003000301080100450000000000600950000000003078004000600010000904870"),
+    ("hard", "008300200300000008020048000000070510000023000090010703407000000005704002800060300"),
+    ("medium", "000390070200060400800001000000800310004700600900002500000000000005000800000020109"),
+    ("extreme", "004000050067005014010400008070003000008040003000901500001070020009006000605030070"),
+    ("ludicrous", "030006005900500200002010070090008004008000700200600090010050300004009001600100040"),
+)
+
+# solved by the CLI when it is run on a terminal with no input
+EXAMPLE_PUZZLE = EXAMPLE_PUZZLES[4][1]
+
+def format_result(result, output_format):
+    status = STATUS_NAMES[result.status]
+    if output_format == "json":
+        import json
+
+        return json.dumps({
+            "index": result.index,
+            "status": status,
+            "difficulty": round(result.difficulty, 2),
+            "solution": result.solution,
+            "techniques": {TECHNIQUE_NAMES[k]: count for k, count in enumerate(result.histogram) if count},
+        }) + "\n"
+    if output_format == "grid":
+        size = isqrt(len(result.solution))
+        rows = (" ".join(result.solution[i:i + size]) for i in range(0, size * size, size))
+        return "\n".join(rows) + f"\n{status}, difficulty {result.difficulty:.1f}\n\n"
+    return f"{result.solution} {status} {result.difficulty:.1f}\n"
+
+# each source is a puzzle, a puzzle file or - for stdin
+def source_records(sources):
+    for source in sources:
+        if source == "-":
+            yield from text_records(sys.stdin)
+        elif line_record(source) is not None:
+            yield line_record(source)
+        else:
+            yield from puzzle_records(source)
+
+# Line protocol over TCP: each line is a 9x9, 16x16 or 25x25 puzzle and gets one line
+# back, in request order, formatted as by the CLI (line or json); the line "stats" gets the
+# metrics as json. Requests from all connections go through one bounded queue and are gathered
+# into batches of up to batch_size for a process pool kept warm by start(). At most two
+# batches per worker are in flight, so a busy pool fills the queue; a full queue stops the
+# server reading from clients and TCP pushes back on them.
+class SolveServer:
+    def __init__(self, workers=None, batch_size=16, batch_delay=0.001, queue_size=1024, connection_queue=256,
+                 search=False, budget=None, output_format="line"):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.queue_size = queue_size
+        self.connection_queue = connection_queue
+        self.search = search
+        self.budget = budget
+        self.output_format = output_format
+        self.pool = self.queue = self.slots = self.batcher = None
+        self.dispatches = set()
+        # request latencies in seconds, enqueue to result, for the most recent requests
+        self.latencies = deque(maxlen=10_000)
+        self.requests = self.batches = self.in_flight = self.connections = self.cancelled = 0
+
+    async def start(self):
+        import asyncio
+        from concurrent.futures import ProcessPoolExecutor
+
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.queue = asyncio.Queue(self.queue_size)
+        self.slots = asyncio.Semaphore(2 * self.workers)
+        # one call per worker so every process has imported the module before requests arrive
+        warm = [line_record(EXAMPLE_PUZZLE)]
+        await asyncio.gather(*(
+            loop.run_in_executor(self.pool, solve_results_chunk, 0, warm) for _ in range(self.workers)
+        ))
+        self.batcher = loop.create_task(self.gather_batches())
+
+    def close(self):
+        if self.batcher is not None:
+            self.batcher.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    def metrics(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 3)
+
+        return {
+            "requests": self.requests,
+            "cancelled": self.cancelled,
+            "batches": self.batches,
+            "connections": self.connections,
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue_size,
+            "batches_in_flight": self.in_flight,
+            "p50_ms": percentile(0.50) if latencies else None,
+            "p99_ms": percentile(0.99) if latencies else None,
+            "max_ms": round(latencies[-1] * 1000, 3) if latencies else None,
+        }
+
+    # Waits for a free pool slot, then takes what is queued. A lone request waits
+    # batch_delay for company; under load the queue fills while the pool is busy, so
+    # batches grow without waiting.
+    async def gather_batches(self):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        queue = self.queue
+        while True:
+            await self.slots.acquire()
+            batch = [await queue.get()]
+            if queue.qsize() < self.batch_size - 1 and self.batch_delay:
+                await asyncio.sleep(self.batch_delay)
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            # requests of clients that went away are cancelled
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                self.slots.release()
+                continue
+            task = loop.create_task(self.dispatch(batch))
+            self.dispatches.add(task)
+            task.add_done_callback(self.dispatches.discard)
+
+    async def dispatch(self, batch):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        self.batches += 1
+        self.in_flight += 1
+        try:
+            records = [record for record, future, started in batch]
+            results = await loop.run_in_executor(self.pool, solve_results_chunk, 0, records, self.search,
+                                                 self.budget)
+        except Exception as exc:
+            for record, future, started in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            now = time.perf_counter()
+            for (record, future, started), result in zip(batch, results):
+                self.latencies.append(now - started)
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.in_flight -= 1
+            self.slots.release()
+
+    async def handle(self, reader, writer):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        replies = asyncio.Queue(self.connection_queue)
+        sender = loop.create_task(self.send_replies(replies, writer))
+        self.connections += 1
+        try:
+            number = 0
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):
+                    break
+                if not line:
+                    break
+                text = line.strip()
+                if not text:
+                    continue
+                if text == b"stats":
+                    await replies.put((None, None))
+                    continue
+                future = loop.create_future()
+                await replies.put((number, future))
+                await self.queue.put((line_record(text), future, time.perf_counter()))
+                self.requests += 1
+                number += 1
+            await replies.put(None)
+            await sender
+        finally:
+            self.connections -= 1
+            sender.cancel()
+            writer.close()
+
+    # Writes replies in request order. If the client goes away or the pool breaks, the
+    # connection is closed and the remaining requests are cancelled, still consuming
+    # replies so the reading side cannot block.
+    async def send_replies(self, replies, writer):
+        import json
+
+        while True:
+            item = await replies.get()
+            if item is None:
+                return
+            number, future = item
+            if writer is None:
+                if future is not None and future.cancel():
+                    self.cancelled += 1
+                continue
+            try:
+                if future is None:
+                    text = json.dumps(self.metrics()) + "\n"
+                else:
+                    text = format_result((await future)._replace(index=number), self.output_format)
+                writer.write(text.encode())
+                await writer.drain()
+            except Exception:
+                writer.close()
+                writer = None
+
+async def serve(host="127.0.0.1", port=8765, **options):
+    import asyncio
+
+    server = SolveServer(**options)
+    try:
+        await server.start()
+        listener = await asyncio.start_server(server.handle, host, port)
+        async with listener:
+            for sock in listener.sockets:
+                print("listening on %s:%d" % sock.getsockname()[:2], file=sys.stderr)
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+# Sends puzzles to a running serve() and returns its reply lines, writing while it reads
+# so a long list does not stall against the server's backpressure.
+async def solve_remote(puzzles, host="127.0.0.1", port=8765):
+    import asyncio
+
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def send():
+        for puzzle in puzzles:
+            writer.write(puzzle.encode() + b"\n")
+            await writer.drain()
+        writer.write_eof()
+
+    sender = asyncio.get_running_loop().create_task(send())
+    try:
+        replies = [line.decode().rstrip("\n") async for line in reader]
+        await sender
+    finally:
+        sender.cancel()
+        writer.close()
+    return replies
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="wang-poddar",
+        description="Solve and grade sudoku puzzles. Exits with 1 if any puzzle is left unsolved.",
+    )
+    parser.add_argument("sources", nargs="*", metavar="PUZZLE|FILE",
+                        help="puzzles of 81, 256 or 625 characters, files with one puzzle per line, "
+                             "or - for stdin (the default)")
+    parser.add_argument("-f", "--format", choices=("line", "grid", "json", "binary"), default="line",
+                        help="line: solution, status and difficulty; binary: the solve_file() record format")
+    parser.add_argument("-o", "--output", help="write results here instead of stdout")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="worker processes; 0 uses every CPU")
+    parser.add_argument("--chunksize", type=int, default=256)
+    parser.add_argument("--unordered", action="store_true", help="write results as they finish")
+    parser.add_argument("--search", action="store_true", help="finish stalled puzzles by search")
+    parser.add_argument("--timeout", type=float, help="seconds allowed per puzzle before it is reported as stopped")
+    parser.add_argument("--max-steps", type=int, help="technique steps allowed per puzzle")
+    parser.add_argument("--serve", metavar="[HOST:]PORT",
+                        help="run the solve service on this address instead of solving sources (see SolveServer)")
+    parser.add_argument("--batch-size", type=int, default=16, help="most puzzles per pool call when serving")
+    args = parser.parse_args(argv)
+
+    budget = None
+    if args.timeout is not None or args.max_steps is not None:
+        budget = SolveBudget(max_steps=args.max_steps, timeout=args.timeout)
+
+    if args.serve:
+        import asyncio
+
+        host, _, port = args.serve.rpartition(":")
+        if args.sources or args.output or args.format not in ("line", "json") or not port.isdigit():
+            parser.error("--serve takes [HOST:]PORT, no sources or --output, and a line or json --format")
+        try:
+            asyncio.run(serve(host or "127.0.0.1", int(port), workers=args.workers or None,
+                              batch_size=args.batch_size, search=args.search, budget=budget,
+                              output_format=args.format))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    sources = args.sources
+    if not sources:
+        # no input on a terminal: solve the built-in example board
+        sources = ["-"] if not sys.stdin.isatty() else [EXAMPLE_PUZZLE]
+    for source in sources:
+        if source != "-" and line_record(source) is None and not os.path.isfile(source):
+            parser.error(f"{source} is neither a puzzle nor a file")
+
+    binary = args.format == "binary"
+    if args.output:
+        out = open(args.output, "wb" if binary else "w")
+    else:
+        out = sys.stdout.buffer if binary else sys.stdout
+
+    # the binary records hold 9x9 boards; the text formats take any size
+    chunk = solve_records_chunk if binary else solve_results_chunk
+    chunks = map_chunks(chunk, source_records(sources), args.workers or None, args.chunksize,
+                        not args.unordered, args.search, budget)
+    unsolved = False
+    try:
+        if binary:
+            out.write(result_header())
+            for packed in chunks:
+                out.write(packed)
+                unsolved |= any(result.status > SEARCHED for result in unpack_results(packed))
+        else:
+            for result in chunks:
+                unsolved |= result.status > SEARCHED
+                out.write(format_result(result, args.format))
+    finally:
+        if args.output:
+            out.close()
+    return 1 if unsolved else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
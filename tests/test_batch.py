@@ -0,0 +1,31 @@
+import pytest
+
+import wang_poddar as sudoku
+from benchmark import CORPUS, load_corpus
+
+pytest.importorskip("numpy")
+
+PUZZLES = [puzzle for puzzles in load_corpus(CORPUS).values() for puzzle in puzzles]
+
+def test_batch_matches_solve():
+    for puzzle, (solution, solved, difficulty, searched) in zip(PUZZLES, sudoku.solve_batch(PUZZLES)):
+        board = sudoku.SudokuBoard.from_string(puzzle).solve()
+        if board.contradiction is not None:
+            # the two engines find the contradiction at different points
+            assert not solved
+            continue
+        assert (solution, solved) == (board.to_string(), board.is_solved())
+        # steps found on one pass are applied together, so grades drift a little
+        assert difficulty == pytest.approx(board.difficulty, rel=0.1)
+
+def test_batch_budget_stops_lockstep():
+    token = sudoku.CancelToken()
+    token.cancel()
+    batch = sudoku.BoardBatch(PUZZLES).solve(sudoku.SolveBudget(token=token))
+    assert batch.stopped == "cancelled"
+    assert not batch.is_solved().any()
+
+def test_vectorized_stream_survives_malformed_lines():
+    results = list(sudoku.solve_many([PUZZLES[0], "garbage", PUZZLES[1]], workers=1, vectorized=True))
+    assert [result.solved for result in results] == [True, False, True]
+    assert results[1][1:] == sudoku.MALFORMED_RESULT
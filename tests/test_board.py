@@ -0,0 +1,118 @@
+import io
+import json
+
+import pytest
+
+import wang_poddar as sudoku
+
+PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+
+def test_get_all_units_returns_cells():
+    board = sudoku.SudokuBoard.from_string(PUZZLE)
+    units = sudoku.get_all_units(board)
+    assert len(units) == 27
+    assert [cell.value for cell in units[0]] == [5, 3, 0, 0, 7, 0, 0, 0, 0]
+    assert [cell.value for cell in units[9]] == [5, 6, 0, 8, 4, 7, 0, 0, 0]
+    assert [cell.value for cell in units[18]] == [5, 3, 0, 6, 0, 0, 0, 9, 8]
+    assert units[0][2].candidates == {1, 2, 4}
+    units[0][2].value = 4
+    assert board.values[2] == 4
+
+def test_snapshots_nest():
+    board = sudoku.SudokuBoard.from_string(PUZZLE)
+    start = board.values[:], board.cands[:], board.difficulty
+    outer = board.snapshot()
+    board.place(0, 2, 4)
+    placed = board.values[:], board.cands[:], board.difficulty
+    inner = board.snapshot()
+    assert board.solve().is_solved()
+    board.restore(inner)
+    assert (board.values, board.cands, board.difficulty) == placed
+    board.restore(outer)
+    assert (board.values, board.cands, board.difficulty) == start
+
+def test_branch_rolls_back_a_contradiction():
+    board = sudoku.SudokuBoard.from_string(PUZZLE)
+    start = board.values[:], board.cands[:]
+    with board.branch():
+        # r1c3 is 4 in the solution
+        board.place(0, 2, 1)
+        assert board.solve().contradiction is not None
+    assert (board.values, board.cands, board.contradiction) == (*start, None)
+    with pytest.raises(sudoku.SudokuContradiction):
+        with board.branch():
+            board.place(0, 2, 2)
+            board.eliminate(3, board.cands[3])
+    assert (board.values, board.cands) == start
+    assert board.solve().is_solved()
+
+def test_trace_buffer_round_trip():
+    trace = sudoku.TraceBuffer(4)
+    board = sudoku.SudokuBoard.from_string(PUZZLE, trace=trace).solve()
+    assert len(trace) > 4
+    steps = list(trace)
+    assert sum(delta for technique, cell, digits, placed, delta in steps) == pytest.approx(board.difficulty)
+    copy = sudoku.TraceBuffer.from_bytes(trace.to_bytes())
+    assert list(copy) == steps
+    out = io.StringIO()
+    copy.write_jsonl(out)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(lines) == len(steps)
+    technique, cell, digits, placed, delta = steps[0]
+    assert lines[0] == {
+        "technique": sudoku.TECHNIQUE_NAMES[technique],
+        "cell": sudoku.STANDARD.cell_names[cell],
+        "action": "place" if placed else "eliminate",
+        "digits": list(sudoku.MASK_DIGITS[digits]),
+        "delta": round(delta, 2),
+    }
+    trace.clear()
+    assert len(trace) == 0 and trace.to_bytes() == b""
+
+def test_technique_stats_merge():
+    hard = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+    first, second, both = sudoku.TechniqueStats(), sudoku.TechniqueStats(), sudoku.TechniqueStats()
+    sudoku.SudokuBoard.from_string(PUZZLE, stats=first).solve()
+    sudoku.SudokuBoard.from_string(hard, stats=second).solve()
+    for puzzle in (PUZZLE, hard):
+        sudoku.SudokuBoard.from_string(puzzle, stats=both).solve()
+    calls = [a + b for a, b in zip(first.calls, second.calls)]
+    first += second
+    assert first.calls == calls == both.calls
+    for field in ("hits", "eliminated", "placed"):
+        assert getattr(first, field) == getattr(both, field)
+    # solving the easy board places each of its empty cells once
+    assert sum(second.placed) + PUZZLE.count("0") == sum(both.placed)
+    assert first.as_dict()["hidden single"]["calls"] == both.calls[sudoku.HIDDEN_SINGLE]
+
+def test_count_solutions_and_filter_unique():
+    empty = "0" * 81
+    invalid = sudoku.EXAMPLE_PUZZLES[6][1]
+    assert sudoku.SudokuBoard.from_string(PUZZLE).count_solutions() == 1
+    assert sudoku.SudokuBoard.from_string(empty).count_solutions(5) == 5
+    assert sudoku.SudokuBoard.from_string(invalid).count_solutions() == 0
+    assert sudoku.SudokuBoard.from_string(PUZZLE).is_unique()
+    assert not sudoku.SudokuBoard.from_string(empty).is_unique()
+    assert not sudoku.SudokuBoard.from_string(invalid).is_unique()
+    lines = [PUZZLE + "\n", empty, "garbage", invalid, PUZZLE.replace("0", ".")]
+    for workers in (1, 2):
+        assert list(sudoku.filter_unique(lines, workers=workers, chunksize=2)) == [PUZZLE, PUZZLE.replace("0", ".")]
+        counts = [count for index, puzzle, count in sudoku.count_many(lines, workers=workers, chunksize=2)]
+        assert counts == [1, 2, 0, 0, 1]
+
+def test_cell_candidates_go_through_the_board():
+    board = sudoku.SudokuBoard.from_string(PUZZLE)
+    cell = board.grid[0][2]
+    with pytest.raises(AttributeError):
+        cell.candidates.discard(1)
+    mark = board.snapshot()
+    cell.candidates -= {1}
+    assert cell.candidates == {2, 4}
+    assert board.cands[2] == sudoku.digits_to_mask({2, 4})
+    assert board.touched
+    with pytest.raises(ValueError):
+        cell.candidates = {1, 2, 4}
+    with pytest.raises(sudoku.SudokuContradiction):
+        cell.candidates = set()
+    board.restore(mark)
+    assert cell.candidates == {1, 2, 4}
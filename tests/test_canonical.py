@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+import wang_poddar as sudoku
+
+SEVENTEEN = "000000010400000000020000000000050407008000300001090000300400200050100000000806000"
+HARD = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+# Relabels digits and shuffles rows, columns, bands and stacks, optionally transposing.
+def shuffle_puzzle(puzzle, rng):
+    digits = list("123456789")
+    rng.shuffle(digits)
+    relabel = {"0": "0", **{str(d + 1): digits[d] for d in range(9)}}
+
+    def order():
+        bands = rng.sample(range(3), 3)
+        return [3 * band + i for band in bands for i in rng.sample(range(3), 3)]
+
+    rows, cols = order(), order()
+    if rng.random() < 0.5:
+        puzzle = "".join(puzzle[c * 9 + r] for r in range(9) for c in range(9))
+    return "".join(relabel[puzzle[r * 9 + c]] for r in rows for c in cols)
+
+# rows like these turned up in real feeds and used to keep canonical_form busy for minutes
+NEAR_EMPTY = [
+    "0" * 81,
+    "1" + "0" * 80,
+    "123456789" + "0" * 72,
+    "123456789" * 2 + "0" * 63,
+    "120000000" * 9,
+]
+
+# a COLUMN_IMAGES that counts lookups, one per column order tried on a row
+class CountedImages(tuple):
+    lookups = 0
+
+    def __getitem__(self, order):
+        CountedImages.lookups += 1
+        return tuple.__getitem__(self, order)
+
+# Too few givens give up at once and too many symmetric orders give up once the work cap
+# trips; either way the puzzle is its own key.
+@pytest.mark.parametrize("puzzle", NEAR_EMPTY)
+def test_canonical_form_is_bounded(puzzle, monkeypatch):
+    sudoku.load_column_tables()
+    monkeypatch.setattr(sudoku, "COLUMN_IMAGES", CountedImages(sudoku.COLUMN_IMAGES))
+    CountedImages.lookups = 0
+    assert sudoku.canonical_form(puzzle) == sudoku.identity_form(puzzle)
+    # at most the capped number of orders kept, tried on each of up to 8 rows, per stage
+    assert CountedImages.lookups <= 8 * 8 * sudoku.CANONICAL_WORK_LIMIT
+
+@pytest.mark.parametrize("puzzle", [SEVENTEEN, HARD])
+def test_canonical_form_ignores_symmetries(puzzle):
+    rng = random.Random(1)
+    forms = {sudoku.canonical_form(shuffle_puzzle(puzzle, rng))[0] for _ in range(20)}
+    assert len(forms) == 1
+
+def test_cached_chunk_with_near_empty_rows():
+    results = sudoku.solve_chunk(0, NEAR_EMPTY + [SEVENTEEN], cache_size=16)
+    assert [result.solved for result in results] == [False] * len(NEAR_EMPTY) + [True]
+
+def test_caches_keep_engines_apart(tmp_path):
+    pytest.importorskip("numpy")
+    from benchmark import CORPUS, load_corpus
+
+    puzzles = [puzzle for puzzles in load_corpus(CORPUS).values() for puzzle in puzzles][::10]
+    fresh = list(sudoku.solve_many(puzzles, workers=1))
+    path = str(tmp_path / "cache.db")
+    for cache in [{"cache_path": path}, {"cache_size": 1000}]:
+        list(sudoku.solve_many(puzzles, workers=1, vectorized=True, **cache))
+        assert list(sudoku.solve_many(puzzles, workers=1, **cache)) == fresh
+
+def test_disk_cache_ignores_and_purges_other_versions(tmp_path):
+    path = str(tmp_path / "cache.db")
+    result = sudoku.solve_puzzles([SEVENTEEN])[0]
+    with sudoku.DiskCache(path, version="old") as old:
+        old.put(SEVENTEEN, False, result)
+        old.put(HARD, False, result)
+        old.put(HARD, False, result, "batch")
+    with sudoku.DiskCache(path) as cache:
+        assert cache.get(SEVENTEEN) is None
+        assert cache.solve(SEVENTEEN) == result
+        cache.put(HARD, True, result, "batch")
+        cache.flush()
+        assert cache.get(SEVENTEEN) == result
+        assert cache.get(SEVENTEEN, True) is None
+        assert cache.get(HARD, True) is None
+        assert cache.get(HARD, True, "batch") == result
+        assert cache.purge() == 3
+        assert cache.purge() == 0
+    with sudoku.DiskCache(path, version="old") as old:
+        assert old.get(SEVENTEEN) is None
+    with sudoku.DiskCache(path) as cache:
+        assert cache.get(SEVENTEEN) == result
+        assert cache.get(HARD, True, "batch") == result
@@ -0,0 +1,43 @@
+import wang_poddar as sudoku
+
+SEVENTEEN = "000000010400000000020000000000050407008000300001090000300400200050100000000806000"
+SIXTEEN = (
+    "000001000970608B200850000B0000DF04600C0800000000F00000G0AD002700"
+    "000F00A040003002020E08040A00C000000103C0000BA0000540009B00000010"
+    "0000002E00000030G030001090800020CE09008D0000004787200003E5000000"
+    "D6F0000001000300000BG000C00E5009100090B0G04000AEEC0A00052000F800"
+)
+
+def test_line_record_sizes():
+    assert sudoku.line_record(SEVENTEEN) == bytes(sudoku.puzzle_values(SEVENTEEN))
+    assert sudoku.line_record(SIXTEEN) == bytes(sudoku.puzzle_values(SIXTEEN))
+    assert sudoku.line_record(SIXTEEN.lower().replace("0", ".")) == bytes(sudoku.puzzle_values(SIXTEEN))
+    assert sudoku.line_record("Z" * 256) is None
+    assert sudoku.line_record("0" * 100) is None
+
+def test_cli_solves_larger_boards(capsys):
+    assert sudoku.main([SIXTEEN, SEVENTEEN]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [len(line.split()[0]) for line in lines] == [256, 81]
+    assert all(line.split()[1] == "solved" for line in lines)
+
+def test_cached_chunk_passes_larger_boards_through():
+    results = sudoku.solve_chunk(0, [SIXTEEN, SEVENTEEN], cache_size=8)
+    assert [(result.solved, len(result.solution)) for result in results] == [(True, 256), (True, 81)]
+
+def test_file_and_text_records_agree(tmp_path):
+    lines = ["# " + "x" * 79, SEVENTEEN, "", "not a puzzle", "# comment", SIXTEEN, SEVENTEEN.replace("0", ".") + "\r"]
+    path = tmp_path / "puzzles.txt"
+    path.write_bytes("\n".join(lines).encode())
+    records = list(sudoku.puzzle_records(str(path)))
+    assert records == list(sudoku.text_records(lines))
+    assert records[0] == records[3] == sudoku.line_record(SEVENTEEN)
+    assert records[1] is None
+
+def test_solve_many_survives_malformed_lines():
+    puzzles = [SEVENTEEN, "garbage", SEVENTEEN, "", SEVENTEEN[:-1] + "x"] * 3
+    for workers, cache_size in [(1, 0), (2, 0), (1, 8)]:
+        results = list(sudoku.solve_many(puzzles, workers=workers, chunksize=4, cache_size=cache_size))
+        assert [result.index for result in results] == list(range(len(puzzles)))
+        assert [result.solved for result in results] == [True, False, True, False, False] * 3
+        assert results[1][1:] == sudoku.MALFORMED_RESULT
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+import wang_poddar as sudoku
+from benchmark import CORPUS, load_corpus
+
+PUZZLES = load_corpus(CORPUS)["easy"][:30]
+
+async def stats(port):
+    return json.loads((await sudoku.solve_remote(["stats"], port=port))[0])
+
+# stats once the server has closed every other connection and finished its work
+async def settled(port):
+    while True:
+        metrics = await stats(port)
+        if metrics["connections"] == 1 and not metrics["queue_depth"] and not metrics["batches_in_flight"]:
+            return metrics
+        await asyncio.sleep(0.05)
+
+# Sends count puzzles and hangs up without reading a reply.
+async def abandon(port, count):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write("".join(PUZZLES[k % len(PUZZLES)] + "\n" for k in range(count)).encode())
+    await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+
+async def exercise_server():
+    server = sudoku.SolveServer(workers=1, batch_size=2, queue_size=64, connection_queue=16, output_format="json")
+    await server.start()
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        requests = [PUZZLES[k::3] for k in range(3)]
+        for lines in requests:
+            lines.insert(4, "garbage")
+            lines.append("stats")
+        replies = await asyncio.gather(*(sudoku.solve_remote(lines, port=port) for lines in requests))
+        for lines, answers in zip(requests, replies):
+            assert len(answers) == len(lines)
+            answers = [json.loads(answer) for answer in answers]
+            assert "requests" in answers.pop()
+            assert [answer["index"] for answer in answers] == list(range(len(lines) - 1))
+            for puzzle, answer in zip(lines, answers):
+                if puzzle == "garbage":
+                    assert answer["status"] == "malformed"
+                else:
+                    board = sudoku.SudokuBoard.from_string(puzzle).solve()
+                    assert (answer["status"], answer["solution"]) == ("solved", board.to_string())
+
+        before = await settled(port)
+        assert (before["requests"], before["cancelled"]) == (len(PUZZLES) + 3, 0)
+        await abandon(port, 2000)
+        # wait for the connection to be noticed as gone, then for its dispatched batches
+        await asyncio.sleep(0.2)
+        metrics = await asyncio.wait_for(settled(port), 30)
+        # at most two batches of two were with the pool when the client left
+        assert metrics["requests"] - before["requests"] - 4 <= metrics["cancelled"]
+        assert metrics["cancelled"] > 0
+        # the server keeps serving after a client goes away
+        assert (await sudoku.solve_remote(PUZZLES[:2], port=port))[1].startswith("{")
+    finally:
+        listener.close()
+        await listener.wait_closed()
+        server.close()
+
+def test_server_pipelines_clients():
+    asyncio.run(exercise_server())
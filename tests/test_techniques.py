@@ -0,0 +1,130 @@
+import random
+from functools import lru_cache
+
+import pytest
+
+import wang_poddar as sudoku
+from benchmark import CORPUS, load_corpus
+
+TECHNIQUE_METHODS = (
+    "apply_hidden_singles", "apply_naked_singles", "apply_pointing_pairs_triples", "apply_box_line_reduction",
+    "apply_hidden_pairs", "apply_naked_pairs", "apply_x_wing", "apply_naked_triples", "apply_hidden_triples",
+    "apply_swordfish", "apply_xy_wing", "apply_simple_coloring", "apply_x_chain", "apply_naked_quads",
+    "apply_jellyfish", "apply_hidden_quads",
+)
+
+# every solution of a candidate state, by plain backtracking, or None past limit
+def all_solutions(values, cands, limit=64):
+    found = []
+
+    def branch(values, cands):
+        empty = [i for i in range(81) if not values[i]]
+        if not empty:
+            found.append(values)
+            return len(found) > limit
+        i = min(empty, key=lambda i: sudoku.POPCOUNT[cands[i]])
+        for digit in sudoku.MASK_DIGITS[cands[i]]:
+            branch_values, branch_cands = values[:], cands[:]
+            if sudoku.propagate(branch_values, branch_cands, [(i, digit)]):
+                if branch(branch_values, branch_cands):
+                    return True
+        return False
+
+    if branch(list(values), list(cands)):
+        return None
+    return found
+
+# A trace that fails on any step some solution disagrees with: an elimination of a digit
+# a solution puts in that cell, or a placement not every solution makes.
+class SolutionCheck:
+    def __init__(self, solutions):
+        self.allowed = [0] * 81
+        self.fixed = list(solutions[0])
+        for solution in solutions:
+            for i, digit in enumerate(solution):
+                self.allowed[i] |= sudoku.DIGIT_BIT[digit]
+                if self.fixed[i] != digit:
+                    self.fixed[i] = 0
+        self.used = set()
+
+    def step(self, technique, cell, digits, placed, delta):
+        name = sudoku.TECHNIQUE_NAMES[technique]
+        self.used.add(technique)
+        if placed:
+            assert digits == sudoku.DIGIT_BIT[self.fixed[cell]], f"{name} placed a digit some solution lacks"
+        else:
+            assert not digits & self.allowed[cell], f"{name} removed a digit some solution uses"
+
+# the corpus puzzles with a solution; two of the bundled examples have none
+@lru_cache()
+def corpus_puzzles():
+    puzzles = (puzzle for puzzles in load_corpus(CORPUS).values() for puzzle in puzzles)
+    return tuple(puzzle for puzzle in puzzles if sudoku.SudokuBoard.from_string(puzzle).count_solutions(1))
+
+# corpus puzzles with a few givens taken out, keeping those with 2 to 64 solutions
+@lru_cache()
+def ambiguous_puzzles(count=150, seed=1):
+    rng = random.Random(seed)
+    puzzles = []
+    for puzzle in corpus_puzzles():
+        values = sudoku.puzzle_values(puzzle)
+        for i in rng.sample([i for i, value in enumerate(values) if value], 3):
+            values[i] = 0
+        solutions = all_solutions(values, sudoku.value_candidates(values))
+        if solutions is not None and len(solutions) > 1:
+            puzzles.append((values, solutions))
+        if len(puzzles) == count:
+            break
+    return puzzles
+
+# States part way through a solve, each with every solution it still allows: the unique
+# corpus puzzles and the ambiguous ones, stopped after a random number of steps.
+@lru_cache()
+def partial_states(seed=1):
+    rng = random.Random(seed)
+    states = []
+    for values in [sudoku.puzzle_values(puzzle) for puzzle in corpus_puzzles()[::2]] + [
+        values for values, solutions in ambiguous_puzzles()[::2]
+    ]:
+        budget = sudoku.SolveBudget(max_steps=rng.randrange(1, 60))
+        state = sudoku.SudokuBoard.from_values(values).solve(budget=budget)
+        states.append((state.values, state.cands, all_solutions(state.values, state.cands)))
+    return states
+
+def test_solve_matches_search():
+    for puzzle in corpus_puzzles():
+        board = sudoku.SudokuBoard.from_string(puzzle).solve()
+        values = sudoku.puzzle_values(puzzle)
+        count, solution = sudoku.search(values, sudoku.value_candidates(values), 2)
+        assert count == 1
+        assert board.contradiction is None
+        for i, value in enumerate(board.values):
+            assert value == solution[i] if value else board.cands[i] & sudoku.DIGIT_BIT[solution[i]]
+
+def test_solve_steps_are_sound():
+    used = set()
+    cases = [(sudoku.puzzle_values(puzzle), None) for puzzle in corpus_puzzles()] + ambiguous_puzzles()
+    for values, solutions in cases:
+        if solutions is None:
+            solutions = [sudoku.search(values, sudoku.value_candidates(values))[1]]
+        check = SolutionCheck(solutions)
+        board = sudoku.SudokuBoard.from_values(values, trace=check).solve()
+        assert board.contradiction is None
+        used |= check.used
+    # the corpus reaches every chain technique, so each one was checked
+    assert {sudoku.X_WING, sudoku.XY_WING, sudoku.SIMPLE_COLORING, sudoku.X_CHAIN} <= used
+
+# Each technique on its own, where the techniques before it may still apply, against
+# every solution of the state.
+@pytest.mark.parametrize("method", TECHNIQUE_METHODS)
+def test_technique_against_brute_force(method):
+    fired = 0
+    for values, cands, solutions in partial_states():
+        assert solutions, "the partial solve lost every solution"
+        check = SolutionCheck(solutions)
+        board = sudoku.SudokuBoard.from_values(values, trace=check)
+        board.cands = cands[:]
+        getattr(board, method)()
+        fired += bool(check.used)
+    # an empty run would pass without checking anything
+    assert fired